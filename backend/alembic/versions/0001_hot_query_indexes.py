@@ -0,0 +1,51 @@
+"""Add composite indexes for the hot inspection, response, user and form queries
+
+Revision ID: 0001_hot_query_indexes
+Revises:
+Create Date: 2026-10-16
+
+Each index matches a query shape in routers/inspections.py,
+routers/dashboard.py, routers/doc_number.py or the keyset-paginated list
+endpoints. check_query_plans.py runs EXPLAIN on those queries to confirm
+the planner picks them up.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_hot_query_indexes'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_inspections_created_id", "inspections", ["created_at", "id"]),
+    ("ix_inspections_inspector_created_id", "inspections", ["inspector_id", "created_at", "id"]),
+    ("ix_inspections_inspector_status", "inspections", ["inspector_id", "status"]),
+    ("ix_inspections_status_created_id", "inspections", ["status", "created_at", "id"]),
+    ("ix_inspections_form_created", "inspections", ["form_id", "created_at"]),
+    ("ix_inspection_responses_inspection_field", "inspection_responses", ["inspection_id", "field_id"]),
+    ("ix_inspection_responses_field", "inspection_responses", ["field_id"]),
+    ("ix_users_active_created_id", "inspecpro_users", ["is_active", "created_at", "id"]),
+    ("ix_forms_active_created_id", "forms", ["is_active", "created_at", "id"]),
+]
+
+
+def _existing_indexes(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    for name, table_name, columns in INDEXES:
+        # Databases bootstrapped from the models may already have the index
+        if name not in _existing_indexes(table_name):
+            op.create_index(name, table_name, columns)
+
+
+def downgrade() -> None:
+    for name, table_name, _columns in reversed(INDEXES):
+        if name in _existing_indexes(table_name):
+            op.drop_index(name, table_name=table_name)
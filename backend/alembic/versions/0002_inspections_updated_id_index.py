@@ -0,0 +1,36 @@
+"""Add the (updated_at, id) index used by incremental exports
+
+Revision ID: 0002_inspections_updated_id
+Revises: 0001_hot_query_indexes
+Create Date: 2026-10-16
+
+Incremental exports (the `since` watermark on export-excel) seek on
+(updated_at, id) and read the latest watermark from the same index.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_inspections_updated_id'
+down_revision = '0001_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+INDEX_NAME = "ix_inspections_updated_id"
+
+
+def _existing_indexes(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    if INDEX_NAME not in _existing_indexes("inspections"):
+        op.create_index(INDEX_NAME, "inspections", ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    if INDEX_NAME in _existing_indexes("inspections"):
+        op.drop_index(INDEX_NAME, table_name="inspections")
@@ -0,0 +1,43 @@
+"""Add the per-form, per-year document number sequence table
+
+Revision ID: 0003_doc_number_sequences
+Revises: 0002_inspections_updated_id
+Create Date: 2026-10-16
+
+next-doc-number increments one (form_id, year) row under a row lock
+instead of scanning every response of the form. Rows are seeded lazily
+from the legacy doc numbers stored in inspection responses.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_doc_number_sequences'
+down_revision = '0002_inspections_updated_id'
+branch_labels = None
+depends_on = None
+
+
+TABLE_NAME = "doc_number_sequences"
+
+
+def _table_exists():
+    return sa.inspect(op.get_bind()).has_table(TABLE_NAME)
+
+
+def upgrade() -> None:
+    # Databases bootstrapped from the models may already have the table
+    if not _table_exists():
+        op.create_table(
+            TABLE_NAME,
+            sa.Column("form_id", sa.Integer(), sa.ForeignKey("forms.id"), primary_key=True),
+            sa.Column("year", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("last_value", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+
+def downgrade() -> None:
+    if _table_exists():
+        op.drop_table(TABLE_NAME)
@@ -0,0 +1,39 @@
+"""Add the unique, indexed inspections.doc_number column
+
+Revision ID: 0004_inspections_doc_number
+Revises: 0003_doc_number_sequences
+Create Date: 2026-10-16
+
+Doc numbers used to exist only as free text in inspection_responses.
+Existing rows are filled by backfill_doc_numbers.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_inspections_doc_number'
+down_revision = '0003_doc_number_sequences'
+branch_labels = None
+depends_on = None
+
+
+INDEX_NAME = "ux_inspections_doc_number"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    # Databases bootstrapped from the models may already have the column and index
+    if "doc_number" not in {column["name"] for column in inspector.get_columns("inspections")}:
+        op.add_column("inspections", sa.Column("doc_number", sa.String(100), nullable=True))
+    if INDEX_NAME not in {index["name"] for index in inspector.get_indexes("inspections")}:
+        op.create_index(INDEX_NAME, "inspections", ["doc_number"], unique=True)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if INDEX_NAME in {index["name"] for index in inspector.get_indexes("inspections")}:
+        op.drop_index(INDEX_NAME, table_name="inspections")
+    if "doc_number" in {column["name"] for column in inspector.get_columns("inspections")}:
+        with op.batch_alter_table("inspections") as batch_op:
+            batch_op.drop_column("doc_number")
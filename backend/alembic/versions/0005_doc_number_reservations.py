@@ -0,0 +1,51 @@
+"""Add doc number range reservations for offline devices
+
+Revision ID: 0005_doc_number_reservations
+Revises: 0004_inspections_doc_number
+Create Date: 2026-10-16
+
+Line tablets reserve a block of sequence values in one call and assign
+final doc numbers offline; unused values can be released afterwards.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_doc_number_reservations'
+down_revision = '0004_inspections_doc_number'
+branch_labels = None
+depends_on = None
+
+
+TABLE_NAME = "doc_number_reservations"
+INDEX_NAME = "ix_doc_number_reservations_form_device"
+
+
+def _table_exists():
+    return sa.inspect(op.get_bind()).has_table(TABLE_NAME)
+
+
+def upgrade() -> None:
+    # Databases bootstrapped from the models may already have the table
+    if not _table_exists():
+        op.create_table(
+            TABLE_NAME,
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("form_id", sa.Integer(), sa.ForeignKey("forms.id"), nullable=False),
+            sa.Column("year", sa.Integer(), nullable=False),
+            sa.Column("device_id", sa.String(100), nullable=False),
+            sa.Column("reserved_by", sa.Integer(), sa.ForeignKey("inspecpro_users.id"), nullable=False),
+            sa.Column("first_value", sa.Integer(), nullable=False),
+            sa.Column("last_value", sa.Integer(), nullable=False),
+            sa.Column("released_from", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("released_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_doc_number_reservations_id", TABLE_NAME, ["id"])
+        op.create_index(INDEX_NAME, TABLE_NAME, ["form_id", "device_id"])
+
+
+def downgrade() -> None:
+    if _table_exists():
+        op.drop_table(TABLE_NAME)
@@ -0,0 +1,46 @@
+"""Add the denormalized inspection summary counters
+
+Revision ID: 0006_inspections_summary_counters
+Revises: 0005_doc_number_reservations
+Create Date: 2026-10-16
+
+response_count, flagged_count, pass_count and hold_count on inspections
+replace per-request aggregation over inspection_responses. Existing rows
+start at zero; backfill_inspection_counters.py recomputes them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_inspections_summary_counters'
+down_revision = '0005_doc_number_reservations'
+branch_labels = None
+depends_on = None
+
+
+COUNTER_COLUMNS = ["response_count", "flagged_count", "pass_count", "hold_count"]
+
+
+def _existing_columns():
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns("inspections")}
+
+
+def upgrade() -> None:
+    existing = _existing_columns()
+    for column in COUNTER_COLUMNS:
+        # Databases bootstrapped from the models (or the old backfill script) may already have it
+        if column not in existing:
+            op.add_column(
+                "inspections",
+                sa.Column(column, sa.Integer(), nullable=False, server_default="0")
+            )
+
+
+def downgrade() -> None:
+    existing = _existing_columns()
+    with op.batch_alter_table("inspections") as batch_op:
+        for column in reversed(COUNTER_COLUMNS):
+            if column in existing:
+                batch_op.drop_column(column)
@@ -0,0 +1,41 @@
+"""Add revision counters to forms and inspections
+
+Revision ID: 0007_revision_counters
+Revises: 0006_inspections_summary_counters
+Create Date: 2026-10-16
+
+updated_at has one-second resolution, so two changes in the same second
+leave it unchanged. revision is incremented by every UPDATE of the row
+and feeds the export and PDF cache keys instead.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_revision_counters'
+down_revision = '0006_inspections_summary_counters'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ["forms", "inspections"]
+
+
+def _has_revision(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return "revision" in {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    for table_name in TABLES:
+        # Databases bootstrapped from the models may already have the column
+        if not _has_revision(table_name):
+            op.add_column(table_name, sa.Column("revision", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    for table_name in reversed(TABLES):
+        if _has_revision(table_name):
+            with op.batch_alter_table(table_name) as batch_op:
+                batch_op.drop_column("revision")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Backfill script for inspections.doc_number.
+Script ini akan:
+1. Memastikan kolom inspections.doc_number sudah ada (jalankan `alembic upgrade head` dulu)
+2. Mengambil doc number dari response field "No Doc" per batch inspection id,
+   atau dari response berformat ABBR-YYYYN seperti generator lama
+3. Melewati doc number duplikat (inspection dengan id terkecil yang dipakai)
+
+Usage:
+    python backfill_doc_numbers.py [--batch-size 1000]
+"""
+
+import argparse
+import logging
+from collections import defaultdict
+from sqlalchemy import bindparam, inspect, update
+from sqlalchemy.orm import sessionmaker
+from database import engine
+from models import Form, FormField, Inspection, InspectionResponse
+from utils.doc_numbers import find_doc_number
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def has_doc_number_column() -> bool:
+    """True once the doc_number migration has been applied"""
+    columns = {column["name"] for column in inspect(engine).get_columns(Inspection.__tablename__)}
+    return "doc_number" in columns
+
+
+# doc_number UPDATE by id. updated_at and revision are set to themselves so
+# their onupdate hooks do not stamp every inspection as changed by the backfill.
+inspections = Inspection.__table__
+UPDATE_DOC_NUMBER = update(inspections).where(inspections.c.id == bindparam("inspection_id")).values({
+    "doc_number": bindparam("doc_number"),
+    "updated_at": inspections.c.updated_at,
+    "revision": inspections.c.revision,
+})
+
+
+def backfill_doc_numbers(batch_size: int) -> int:
+    """Fill doc_number for inspections that have none, batch_size inspections at a time"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    updated = 0
+    last_id = 0
+
+    try:
+        forms = {form.id: form for form in db.query(Form).all()}
+        fields_by_id = {field.id: field for field in db.query(FormField).all()}
+        used = {
+            doc_number for (doc_number,) in
+            db.query(Inspection.doc_number).filter(Inspection.doc_number.isnot(None)).all()
+        }
+
+        while True:
+            batch = db.query(Inspection.id, Inspection.form_id).filter(
+                Inspection.id > last_id,
+                Inspection.doc_number.is_(None)
+            ).order_by(Inspection.id).limit(batch_size).all()
+            if not batch:
+                break
+
+            responses = defaultdict(list)
+            for row in db.query(
+                InspectionResponse.inspection_id, InspectionResponse.field_id, InspectionResponse.response_value
+            ).filter(
+                InspectionResponse.inspection_id.in_([row.id for row in batch])
+            ).order_by(InspectionResponse.id).all():
+                responses[row.inspection_id].append((row.field_id, row.response_value))
+
+            mappings = []
+            for row in batch:
+                try:
+                    doc_number = find_doc_number(forms[row.form_id], fields_by_id, responses[row.id])
+                except ValueError as e:
+                    logger.warning(f"⚠️ Inspection {row.id}: {e}, skipped")
+                    continue
+                if not doc_number:
+                    continue
+                if doc_number in used:
+                    logger.warning(f"⚠️ Inspection {row.id}: doc number {doc_number} already used, skipped")
+                    continue
+                used.add(doc_number)
+                mappings.append({'inspection_id': row.id, 'doc_number': doc_number})
+
+            if mappings:
+                db.execute(UPDATE_DOC_NUMBER, mappings)
+            db.commit()
+
+            updated += len(mappings)
+            last_id = batch[-1].id
+            logger.info(f"🔄 Backfilled {updated} doc numbers (last id {last_id})")
+
+        return updated
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main() -> bool:
+    """Main backfill function"""
+    parser = argparse.ArgumentParser(description="Backfill inspection doc numbers")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Inspections per batch")
+    args = parser.parse_args()
+
+    logger.info("🚀 Starting doc number backfill...")
+
+    if not has_doc_number_column():
+        logger.error("❌ inspections.doc_number does not exist; run `alembic upgrade head` first")
+        return False
+
+    try:
+        total = backfill_doc_numbers(args.batch_size)
+    except Exception as e:
+        logger.error(f"❌ Backfill failed: {e}")
+        return False
+
+    logger.info(f"🎉 Backfill complete: {total} inspections updated")
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        exit(1)
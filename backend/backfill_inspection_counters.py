@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Backfill script for the denormalized inspection summary counters.
+Script ini akan:
+1. Memastikan kolom response_count, flagged_count, pass_count dan hold_count
+   sudah ada (jalankan `alembic upgrade head` dulu)
+2. Mengevaluasi ulang is_flagged setiap response dengan flag rules field saat ini
+   (response lama tersimpan dengan is_flagged yang salah)
+3. Menghitung ulang counter dari inspection_responses per batch inspection id
+4. Menyimpan hasilnya tanpa memuat response ke memory satu per satu
+
+Usage:
+    python backfill_inspection_counters.py [--batch-size 1000]
+"""
+
+import argparse
+import logging
+from sqlalchemy import bindparam, case, func, inspect, update
+from sqlalchemy.orm import sessionmaker
+from database import engine
+from models import FormField, Inspection, InspectionResponse
+from utils.flag_evaluator import compile_flag_rule
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+COUNTER_COLUMNS = ["response_count", "flagged_count", "pass_count", "hold_count"]
+
+# Counter UPDATE by id. updated_at and revision are set to themselves so their
+# onupdate hooks do not stamp every inspection as changed by the backfill.
+inspections = Inspection.__table__
+UPDATE_COUNTERS = update(inspections).where(inspections.c.id == bindparam("inspection_id")).values({
+    **{column: bindparam(column) for column in COUNTER_COLUMNS},
+    "updated_at": inspections.c.updated_at,
+    "revision": inspections.c.revision,
+})
+
+
+def missing_counter_columns() -> list:
+    """Counter columns the inspections table does not have yet"""
+    existing = {column["name"] for column in inspect(engine).get_columns(Inspection.__tablename__)}
+    return [column for column in COUNTER_COLUMNS if column not in existing]
+
+
+def reevaluate_flags(db, inspection_ids: list, rules: dict) -> int:
+    """
+    Re-run the flag rules over the stored responses of a batch of inspections.
+
+    rules caches compiled rules by field id across batches. Responses
+    without a (known) field are never flagged, as in the API. Returns how
+    many is_flagged values changed.
+    """
+    responses = db.query(
+        InspectionResponse.id,
+        InspectionResponse.field_id,
+        InspectionResponse.response_value,
+        InspectionResponse.measurement_value,
+        InspectionResponse.is_flagged
+    ).filter(InspectionResponse.inspection_id.in_(inspection_ids)).all()
+
+    missing_ids = {row.field_id for row in responses if row.field_id is not None} - rules.keys()
+    if missing_ids:
+        rules.update(dict.fromkeys(missing_ids))
+        for field in db.query(FormField).filter(FormField.id.in_(missing_ids)):
+            rules[field.id] = compile_flag_rule(field.field_type, field.flag_conditions)
+
+    mappings = []
+    for row in responses:
+        rule = rules.get(row.field_id)
+        is_flagged = rule is not None and rule.is_flagged(row.response_value, row.measurement_value)
+        if is_flagged != bool(row.is_flagged):
+            mappings.append({'id': row.id, 'is_flagged': is_flagged})
+
+    db.bulk_update_mappings(InspectionResponse, mappings)
+    return len(mappings)
+
+
+def backfill_counters(batch_size: int) -> int:
+    """Recompute counters for every inspection, batch_size inspections at a time"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    updated = 0
+    flags_changed = 0
+    last_id = 0
+    rules = {}
+
+    try:
+        while True:
+            inspection_ids = [
+                row.id for row in db.query(Inspection.id)
+                .filter(Inspection.id > last_id)
+                .order_by(Inspection.id)
+                .limit(batch_size)
+                .all()
+            ]
+            if not inspection_ids:
+                break
+
+            # Flags first: flagged_count is counted from them below
+            flags_changed += reevaluate_flags(db, inspection_ids, rules)
+
+            counts = db.query(
+                InspectionResponse.inspection_id,
+                func.count(InspectionResponse.id).label('response_count'),
+                func.sum(case((InspectionResponse.is_flagged == True, 1), else_=0)).label('flagged_count'),
+                func.sum(case((func.lower(InspectionResponse.pass_hold_status) == 'pass', 1), else_=0)).label('pass_count'),
+                func.sum(case((func.lower(InspectionResponse.pass_hold_status) == 'hold', 1), else_=0)).label('hold_count')
+            ).filter(
+                InspectionResponse.inspection_id.in_(inspection_ids)
+            ).group_by(InspectionResponse.inspection_id).all()
+
+            counts_map = {row.inspection_id: row for row in counts}
+
+            mappings = []
+            for inspection_id in inspection_ids:
+                row = counts_map.get(inspection_id)
+                mappings.append({
+                    'inspection_id': inspection_id,
+                    'response_count': int(row.response_count or 0) if row else 0,
+                    'flagged_count': int(row.flagged_count or 0) if row else 0,
+                    'pass_count': int(row.pass_count or 0) if row else 0,
+                    'hold_count': int(row.hold_count or 0) if row else 0,
+                })
+
+            db.execute(UPDATE_COUNTERS, mappings)
+            db.commit()
+
+            updated += len(inspection_ids)
+            last_id = inspection_ids[-1]
+            logger.info(f"🔄 Backfilled {updated} inspections (last id {last_id}), {flags_changed} flags corrected")
+
+        if flags_changed:
+            # Revisions are left alone, so cached exports do not see the corrected flags
+            logger.warning("⚠️ Flags were corrected: clear EXPORT_CACHE_DIR (cache/exports) so exports pick them up")
+        return updated
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main() -> bool:
+    """Main backfill function"""
+    parser = argparse.ArgumentParser(description="Backfill inspection summary counters")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Inspections per batch")
+    args = parser.parse_args()
+
+    logger.info("🚀 Starting inspection counter backfill...")
+
+    missing = missing_counter_columns()
+    if missing:
+        logger.error(f"❌ inspections is missing {', '.join(missing)}; run `alembic upgrade head` first")
+        return False
+
+    try:
+        total = backfill_counters(args.batch_size)
+    except Exception as e:
+        logger.error(f"❌ Backfill failed: {e}")
+        return False
+
+    logger.info(f"🎉 Backfill complete: {total} inspections updated")
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        exit(1)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ParagraphStyle allocations and render time for a large PDF report.
+Script ini akan:
+1. Membuat database SQLite sementara dengan satu form berisi 400 field dan satu inspection
+2. Merender laporan PDF beberapa kali dengan build_inspection_pdf
+3. Mencatat jumlah ParagraphStyle yang dibuat per laporan dan waktu render (median)
+
+Run from the backend directory, on any commit, to compare numbers:
+    python benchmarks/bench_pdf_styles.py [--fields 400] [--runs 5]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = tempfile.mkdtemp(prefix="inspecpro_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(BENCH_DIR)
+
+from reportlab.lib.styles import ParagraphStyle  # noqa: E402
+
+from database import SessionLocal, engine  # noqa: E402
+from models import (  # noqa: E402
+    Base,
+    FieldType,
+    Form,
+    FormField,
+    Inspection,
+    InspectionResponse,
+    InspectionStatus,
+    User,
+    UserRole,
+)
+from utils.pdf_report import build_inspection_pdf  # noqa: E402
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Field types cycled through the benchmark form, with a matching answer
+FIELD_SAMPLES = [
+    (FieldType.text, {"response_value": "GRA-INS-2025001"}),
+    (FieldType.dropdown, {"response_value": "PASS"}),
+    (FieldType.measurement, {"measurement_value": 5.25}),
+    (FieldType.notes, {"response_value": "Registration within tolerance, no smudging on the second pass"}),
+    (FieldType.button, {"response_value": "HOLD"}),
+]
+
+
+def seed_report(db, field_count: int) -> Inspection:
+    """Create a user, a form with field_count fields and one answered inspection"""
+    Base.metadata.create_all(bind=engine)
+    user = User(user_id="B1", username="bench", email="bench@example.com", password_hash="x", role=UserRole.admin)
+    db.add(user)
+    db.commit()
+
+    form = Form(form_name="Benchmark Inspection", created_by=user.id)
+    form.fields = [
+        FormField(
+            field_name=f"Check point {index + 1}",
+            field_type=FIELD_SAMPLES[index % len(FIELD_SAMPLES)][0],
+            field_order=index,
+            field_options={"options": ["PASS", "HOLD"]},
+        )
+        for index in range(field_count)
+    ]
+    db.add(form)
+    db.commit()
+
+    inspection = Inspection(form_id=form.id, inspector_id=user.id, status=InspectionStatus.submitted)
+    inspection.responses = [
+        InspectionResponse(field_id=field.id, **FIELD_SAMPLES[field.field_order % len(FIELD_SAMPLES)][1])
+        for field in form.fields
+    ]
+    db.add(inspection)
+    db.commit()
+    return inspection
+
+
+def count_style_allocations():
+    """Wrap ParagraphStyle.__init__ and return the counter it increments"""
+    counter = {"count": 0}
+    original_init = ParagraphStyle.__init__
+
+    def counting_init(self, *args, **kwargs):
+        counter["count"] += 1
+        original_init(self, *args, **kwargs)
+
+    ParagraphStyle.__init__ = counting_init
+    return counter
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=400, help="fields on the benchmark form")
+    parser.add_argument("--runs", type=int, default=5, help="timed renders")
+    args = parser.parse_args()
+
+    # SQL echo and per-field render logging would dominate the timings
+    engine.echo = False
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    logging.getLogger("sanalyze").setLevel(logging.WARNING)
+
+    db = SessionLocal()
+    try:
+        inspection = seed_report(db, args.fields)
+        form = inspection.form
+
+        # Warm-up render: module-level styles and fonts are built here, not per report
+        build_inspection_pdf(db, inspection, form)
+
+        counter = count_style_allocations()
+        timings = []
+        size = 0
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            size = len(build_inspection_pdf(db, inspection, form))
+            timings.append(time.perf_counter() - started)
+
+        logger.info(f"📄 Report: {args.fields} fields, {size / 1024:.0f} KB")
+        logger.info(f"🎨 ParagraphStyle allocations per report: {counter['count'] / args.runs:.0f}")
+        logger.info(f"⏱️ Render time: median {statistics.median(timings) * 1000:.0f} ms, "
+                    f"min {min(timings) * 1000:.0f} ms over {args.runs} runs")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Benchmark failed: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decode time and peak memory for report photos.
+Script ini akan:
+1. Membuat foto JPEG 12 MP (dan PNG 3 MP) sintetis dengan Pillow
+2. Memproses foto tersebut dengan process_image_for_pdf di proses terpisah, dengan image cache dimatikan
+3. Mencatat waktu per foto (median) dan kenaikan peak RSS proses
+
+Run from the backend directory, on any commit, to compare numbers:
+    python benchmarks/bench_photo_decode.py [--runs 5]
+"""
+
+import argparse
+import base64
+import logging
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# (label, size, Pillow format) of the synthetic photos
+SAMPLES = [
+    ("12 MP JPEG", (4000, 3000), "JPEG"),
+    ("3 MP PNG", (2000, 1500), "PNG"),
+]
+
+# Target box used for photos in the report table
+TARGET_WIDTH = 200
+TARGET_HEIGHT = 150
+
+
+def make_photo(size, image_format: str) -> str:
+    """Base64 data URL of a synthetic photo (gradients plus noise, so it compresses like a real one)"""
+    from PIL import Image
+
+    width, height = size
+    gradient = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 40)
+    photo = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buffer = BytesIO()
+    photo.save(buffer, format=image_format, quality=90)
+    mime = "jpeg" if image_format == "JPEG" else image_format.lower()
+    return f"data:image/{mime};base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(photo_path: str, runs: int, results) -> None:
+    """Child process: process the photo `runs` times and report timings and RSS growth"""
+    os.chdir(tempfile.mkdtemp(prefix="inspecpro_bench_"))
+    sys.path.insert(0, BACKEND_DIR)
+    from utils import pdf_report
+
+    with open(photo_path) as photo_file:
+        data_url = photo_file.read()
+
+    # Every run must decode, not hit the processed-image cache
+    pdf_report.image_cache.get = lambda key: None
+    pdf_report.image_cache.put = lambda *args, **kwargs: None
+    logging.getLogger("sanalyze").setLevel(logging.WARNING)
+
+    baseline = peak_rss_mb()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        image = pdf_report.process_image_for_pdf(data_url, TARGET_WIDTH, TARGET_HEIGHT, 1, "photo")
+        timings.append(time.perf_counter() - started)
+        if image is None:
+            raise RuntimeError("process_image_for_pdf rejected the photo")
+    results.put((timings, peak_rss_mb() - baseline))
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="timed decodes per photo")
+    args = parser.parse_args()
+
+    # Spawned children start clean, so their peak RSS excludes generating the photo
+    context = multiprocessing.get_context("spawn")
+    try:
+        for label, size, image_format in SAMPLES:
+            data_url = make_photo(size, image_format)
+            # Handed over as a file: unpickling a large argument would raise the child's baseline peak
+            with tempfile.NamedTemporaryFile("w", suffix=".b64", delete=False) as photo_file:
+                photo_file.write(data_url)
+            results = context.Queue()
+            child = context.Process(target=measure, args=(photo_file.name, args.runs, results))
+            child.start()
+            timings, rss_growth = results.get()
+            child.join()
+            os.remove(photo_file.name)
+
+            logger.info(f"📷 {label} ({len(data_url) * 3 // 4 // 1024} KB): "
+                        f"median {statistics.median(timings) * 1000:.0f} ms, "
+                        f"min {min(timings) * 1000:.0f} ms over {args.runs} runs, "
+                        f"peak RSS +{rss_growth:.0f} MB")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Benchmark failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
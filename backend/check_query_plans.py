@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN-based check for the hot query shapes.
+Script ini akan:
+1. Membangun query yang sama dengan yang dipakai routers (list, dashboard, doc number, export)
+2. Menjalankan EXPLAIN (MySQL) atau EXPLAIN QUERY PLAN (SQLite) untuk setiap query
+3. Gagal (exit code 1) jika ada query yang melakukan full table scan tanpa index
+
+Run after `alembic upgrade head`:
+    python check_query_plans.py
+"""
+
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import sessionmaker
+from database import engine
+from models import Form, Inspection, InspectionResponse, InspectionStatus, User
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def hot_queries(db):
+    """Return (name, table, query) for every hot query shape"""
+    cursor_created_at = datetime(2025, 1, 1)
+    cursor_id = 1000
+    since = datetime.now() - timedelta(days=30)
+
+    def keyset(query, model):
+        return query.filter(
+            or_(
+                model.created_at < cursor_created_at,
+                and_(model.created_at == cursor_created_at, model.id < cursor_id)
+            )
+        ).order_by(model.created_at.desc(), model.id.desc()).limit(100)
+
+    return [
+        ("inspections list (all roles)", "inspections",
+         keyset(db.query(Inspection), Inspection)),
+        ("inspections list (user role / my-inspections)", "inspections",
+         keyset(db.query(Inspection).filter(Inspection.inspector_id == 1), Inspection)),
+        ("inspections list (status filter)", "inspections",
+         keyset(db.query(Inspection).filter(Inspection.status == InspectionStatus.submitted), Inspection)),
+        ("dashboard stats (user role, by status)", "inspections",
+         db.query(func.count(Inspection.id)).filter(
+             Inspection.inspector_id == 1, Inspection.status == InspectionStatus.accepted)),
+        ("dashboard pending reviews", "inspections",
+         db.query(Inspection).filter(Inspection.status == InspectionStatus.submitted)
+         .order_by(Inspection.created_at.desc())),
+        ("dashboard daily analytics", "inspections",
+         db.query(func.count(Inspection.id)).filter(Inspection.created_at >= since)),
+        ("incremental export (since watermark)", "inspections",
+         db.query(Inspection).filter(
+             or_(
+                 Inspection.updated_at > cursor_created_at,
+                 and_(Inspection.updated_at == cursor_created_at, Inspection.id > cursor_id)
+             )
+         ).order_by(Inspection.updated_at.desc(), Inspection.id.desc()).limit(1)),
+        ("doc number / export by form", "inspections",
+         db.query(Inspection.id).filter(Inspection.form_id == 1)),
+        ("inspection by doc number", "inspections",
+         db.query(Inspection).filter(Inspection.doc_number == "GRA-INS-20251")),
+        ("responses by inspection", "inspection_responses",
+         db.query(InspectionResponse).filter(InspectionResponse.inspection_id.in_([1, 2, 3]))),
+        ("responses by field", "inspection_responses",
+         db.query(func.count(InspectionResponse.id)).filter(InspectionResponse.field_id == 1)),
+        ("users list", "inspecpro_users",
+         keyset(db.query(User).filter(User.is_active == True), User)),
+        ("forms list", "forms",
+         keyset(db.query(Form).filter(Form.is_active == True), Form)),
+    ]
+
+
+def explain(connection, query):
+    """Return EXPLAIN rows for a query as a list of dicts"""
+    sql = str(query.statement.compile(
+        dialect=engine.dialect,
+        compile_kwargs={"literal_binds": True, "render_postcompile": True}
+    ))
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    result = connection.exec_driver_sql(prefix + sql)
+    return [dict(row._mapping) for row in result]
+
+
+def uses_index(plan, table_name):
+    """Check whether the plan reads table_name through an index"""
+    if engine.dialect.name == "sqlite":
+        details = [str(row.get("detail", "")) for row in plan if table_name in str(row.get("detail", ""))]
+        return bool(details) and all("INDEX" in detail for detail in details)
+
+    rows = [row for row in plan if row.get("table") == table_name]
+    return bool(rows) and all(row.get("key") and row.get("type") != "ALL" for row in rows)
+
+
+def main() -> bool:
+    """Main check function"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    failures = []
+
+    logger.info(f"🔍 Checking query plans on {engine.dialect.name}...")
+
+    try:
+        with engine.connect() as connection:
+            for name, table_name, query in hot_queries(db):
+                plan = explain(connection, query)
+                if uses_index(plan, table_name):
+                    logger.info(f"✅ {name}: uses index")
+                else:
+                    logger.error(f"❌ {name}: no index used on {table_name}: {plan}")
+                    failures.append(name)
+    finally:
+        db.close()
+
+    if failures:
+        logger.error(f"❌ {len(failures)} hot queries are not using an index")
+        return False
+
+    logger.info("🎉 All hot queries use an index")
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        exit(1)
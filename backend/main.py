@@ -12,6 +12,7 @@ from database import get_db, engine, Base
 from routers import auth, users, forms, inspections, dashboard, doc_number
 from models import User
 from utils.logging_config import setup_logging, get_logger
+from utils.render_pool import shutdown_render_pool
 
 # Initialize logging system
 setup_logging()
@@ -67,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],  # Added PATCH method
     allow_headers=["*"],  # Allow all headers for development
+    expose_headers=["X-Next-Cursor", "X-Next-Watermark"],  # List pagination cursor, incremental export watermark
 )
 
 # Include routers
@@ -77,6 +79,10 @@ app.include_router(inspections.router, prefix="/api/inspections", tags=["Inspect
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(doc_number.router, prefix="/api/doc-numbers", tags=["Document Numbers"])
 
+@app.on_event("shutdown")
+def stop_render_pool():
+    shutdown_render_pool()
+
 @app.get("/")
 async def root():
     return {"message": "Sanalyze API is running"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, ForeignKey, DECIMAL, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, ForeignKey, DECIMAL, JSON, Index, literal_column
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -63,6 +63,11 @@ class User(Base):
     created_forms = relationship("Form", back_populates="creator")
     inspections = relationship("Inspection", foreign_keys="Inspection.inspector_id", back_populates="inspector")
     reviewed_inspections = relationship("Inspection", foreign_keys="Inspection.reviewed_by", back_populates="reviewer")
+    
+    __table_args__ = (
+        # Active user list ordered for keyset pagination
+        Index("ix_users_active_created_id", "is_active", "created_at", "id"),
+    )
 
 class Form(Base):
     __tablename__ = "forms"
@@ -73,12 +78,19 @@ class Form(Base):
     created_by = Column(Integer, ForeignKey("inspecpro_users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Incremented by every UPDATE of the row, unlike updated_at never equal across changes
+    revision = Column(Integer, nullable=False, default=0, server_default="0", onupdate=literal_column("revision") + 1)
     is_active = Column(Boolean, default=True)
     
     # Relationships
     creator = relationship("User", back_populates="created_forms")
     fields = relationship("FormField", back_populates="form")
     inspections = relationship("Inspection", back_populates="form")
+    
+    __table_args__ = (
+        # Active form list ordered for keyset pagination
+        Index("ix_forms_active_created_id", "is_active", "created_at", "id"),
+    )
 
 class FormField(Base):
     __tablename__ = "form_fields"
@@ -103,6 +115,35 @@ class FormField(Base):
     responses = relationship("InspectionResponse", back_populates="field")
     files = relationship("InspectionFile", back_populates="field")
 
+class DocNumberSequence(Base):
+    __tablename__ = "doc_number_sequences"
+    
+    # Last document number sequence issued per form and year (see routers/doc_number.py)
+    form_id = Column(Integer, ForeignKey("forms.id"), primary_key=True)
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    last_value = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DocNumberReservation(Base):
+    __tablename__ = "doc_number_reservations"
+    
+    # Block of sequence values [first_value, last_value] handed to an offline device
+    id = Column(Integer, primary_key=True, index=True)
+    form_id = Column(Integer, ForeignKey("forms.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    device_id = Column(String(100), nullable=False)
+    reserved_by = Column(Integer, ForeignKey("inspecpro_users.id"), nullable=False)
+    first_value = Column(Integer, nullable=False)
+    last_value = Column(Integer, nullable=False)
+    released_from = Column(Integer)  # First value handed back, if the unused tail was released
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    released_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        # Reservations held by a device for a form
+        Index("ix_doc_number_reservations_form_device", "form_id", "device_id"),
+    )
+
 class Inspection(Base):
     __tablename__ = "inspections"
     
@@ -114,8 +155,16 @@ class Inspection(Base):
     reviewed_at = Column(DateTime(timezone=True))
     rejection_reason = Column(Text)
     reviewer_signature = Column(Text)  # Base64 encoded signature image
+    doc_number = Column(String(100))  # Taken from the "No Doc" response (see utils/doc_numbers.py)
+    # Denormalized response summary, maintained on write (see utils/inspection_summary.py)
+    response_count = Column(Integer, nullable=False, default=0, server_default="0")
+    flagged_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pass_count = Column(Integer, nullable=False, default=0, server_default="0")
+    hold_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Incremented by every UPDATE of the row (see Form.revision)
+    revision = Column(Integer, nullable=False, default=0, server_default="0", onupdate=literal_column("revision") + 1)
     
     # Relationships
     form = relationship("Form", back_populates="inspections")
@@ -123,6 +172,22 @@ class Inspection(Base):
     reviewer = relationship("User", foreign_keys=[reviewed_by], back_populates="reviewed_inspections")
     responses = relationship("InspectionResponse", back_populates="inspection")
     files = relationship("InspectionFile", back_populates="inspection")
+    
+    __table_args__ = (
+        # Inspection lists (all roles), analytics date ranges and export date filters
+        Index("ix_inspections_created_id", "created_at", "id"),
+        # "user" role lists, my-inspections and per-inspector dashboard counts
+        Index("ix_inspections_inspector_created_id", "inspector_id", "created_at", "id"),
+        Index("ix_inspections_inspector_status", "inspector_id", "status"),
+        # Status filtered lists, pending reviews and dashboard status counts
+        Index("ix_inspections_status_created_id", "status", "created_at", "id"),
+        # Form filtered exports, doc numbers and forms summary join
+        Index("ix_inspections_form_created", "form_id", "created_at"),
+        # Incremental exports seek on the (updated_at, id) watermark
+        Index("ix_inspections_updated_id", "updated_at", "id"),
+        # Doc number lookups; one inspection per doc number
+        Index("ux_inspections_doc_number", "doc_number", unique=True),
+    )
 
 class InspectionResponse(Base):
     __tablename__ = "inspection_responses"
@@ -139,6 +204,13 @@ class InspectionResponse(Base):
     # Relationships
     inspection = relationship("Inspection", back_populates="responses")
     field = relationship("FormField", back_populates="responses")
+    
+    __table_args__ = (
+        # Responses loaded, replaced and searched per inspection
+        Index("ix_inspection_responses_inspection_field", "inspection_id", "field_id"),
+        # Response counts per field when fields are removed from a form
+        Index("ix_inspection_responses_field", "field_id"),
+    )
 
 class InspectionFile(Base):
     __tablename__ = "inspection_files"
@@ -29,6 +29,7 @@ async def get_dashboard_stats(
     accepted_inspections = query.filter(Inspection.status == InspectionStatus.accepted).count()
     rejected_inspections = query.filter(Inspection.status == InspectionStatus.rejected).count()
     draft_inspections = query.filter(Inspection.status == InspectionStatus.draft).count()
+    flagged_inspections = query.filter(Inspection.flagged_count > 0).count()
     
     # Get total forms count
     total_forms = db.query(Form).filter(Form.is_active == True).count()
@@ -39,6 +40,7 @@ async def get_dashboard_stats(
         accepted_inspections=accepted_inspections,
         rejected_inspections=rejected_inspections,
         draft_inspections=draft_inspections,
+        flagged_inspections=flagged_inspections,
         total_forms=total_forms
     )
 
@@ -1,104 +1,159 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
 from datetime import datetime
-import re
 
 from database import get_db
-from models import Inspection, InspectionResponse, FormField, Form
+from models import Form, DocNumberReservation
+from schemas import DocNumberReservationCreate, DocNumberReservationRelease, DocNumberReservationResponse
 from auth import get_current_user, User
+from utils.doc_numbers import (
+    DOC_NUMBER_MAX_RESERVATION,
+    doc_number_prefix,
+    peek_sequence_value,
+    reserve_sequence_values,
+    release_sequence_tail,
+)
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
-def generate_doc_number(form_id: int, db: Session) -> str:
+def preview_doc_number(form_id: int, db: Session) -> str:
     """
-    Generate document number for a form
+    Preview the next document number for a form
     Format: FORMABBR-YYYYN  (incremental without zero padding)
     Example: GRA-IN-20251, GRA-IN-20252
+
+    Read-only: the number is consumed when an inspection is saved with it
+    (see claim_doc_number), so opening or switching forms leaves no gaps.
     """
     # Get form details
     form = db.query(Form).filter(Form.id == form_id).first()
     if not form:
         return "DOC-20250001"
-    
-    # Generate abbreviation from the first two words only (3 letters each), sanitized, hyphenated
-    # Example: "Graphic Inspection Report" -> "GRA-INS"
-    import re as _re
-    tokens = _re.findall(r"[A-Za-z0-9]+", (form.form_name or "").upper())
-    part1 = tokens[0][:3] if len(tokens) >= 1 else "DOC"
-    part2 = tokens[1][:3] if len(tokens) >= 2 else None
-    abbr = '-'.join([p for p in [part1, part2] if p])
-    
+
     # Get current year
     current_year = datetime.now().year
-    
-    logger.info(f"Generating doc number for form: {form.form_name} (ID: {form_id})")
-    logger.debug(f"Abbreviation: {abbr}, Year: {current_year}")
-    
-    # Find the last doc number for this form in current year
-    # Query all inspections for this form
-    inspections = db.query(Inspection).filter(
-        Inspection.form_id == form_id
-    ).all()
-    
-    max_number = 0
-    prefix = f"{abbr}-{current_year}"
-    
-    logger.debug(f"Looking for doc numbers with prefix: {prefix}")
-    
-    # Check all responses for No Doc fields
-    found_doc_numbers = []
-    for inspection in inspections:
-        responses = db.query(InspectionResponse).filter(
-            InspectionResponse.inspection_id == inspection.id
-        ).all()
-        
-        for response in responses:
-            if response.response_value and response.response_value.startswith(prefix):
-                found_doc_numbers.append(response.response_value)
-                try:
-                    # Extract sequence from format: ABBR-YYYYN (or messy legacy like ABBR-YYYYYYYY...NNNN)
-                    # Take the substring after the last '-' and strip all leading occurrences of the current year
-                    # Example correct:  "20253"        -> year=2025, tail="3"
-                    # Example legacy:   "202520250004" -> year=2025, tail="0004"
-                    number_part = response.response_value.split('-')[-1]
-                    year_str = str(current_year)
-                    # Remove all repeated year prefixes at the start
-                    while number_part.startswith(year_str):
-                        number_part = number_part[len(year_str):]
-                    # If empty after stripping, treat as 0
-                    tail = number_part or "0"
-                    # Allow leading zeros
-                    sequence_number = int(tail)
-                    logger.debug(f"Found doc number: {response.response_value} -> sequence: {sequence_number}")
-                    
-                    if sequence_number > max_number:
-                        max_number = sequence_number
-                        logger.debug(f"New max sequence: {max_number}")
-                except Exception as e:
-                    logger.warning(f"Error parsing doc number {response.response_value}: {e}")
-                    pass
-    
-    logger.debug(f"Found {len(found_doc_numbers)} existing doc numbers, max sequence: {max_number}")
-    
-    # Generate next number
-    next_number = max_number + 1
+    prefix = doc_number_prefix(form, current_year)
+
+    sequence_number = peek_sequence_value(db, form, current_year)
     # New format without zero padding: ABBR-YYYYN
-    doc_number = f"{abbr}-{current_year}{next_number}"
-    
-    logger.info(f"Generated doc number: {doc_number} for form {form.form_name}")
-    
+    doc_number = f"{prefix}{sequence_number}"
+
+    logger.debug(f"Previewed doc number: {doc_number} for form {form.form_name}")
+
     return doc_number
 
+def _reservation_response(reservation: DocNumberReservation, form: Form) -> DocNumberReservationResponse:
+    """Reservation record plus the doc numbers it still holds"""
+    prefix = doc_number_prefix(form, reservation.year)
+    end = reservation.last_value if reservation.released_from is None else reservation.released_from - 1
+    response = DocNumberReservationResponse.model_validate(reservation)
+    response.doc_numbers = [f"{prefix}{value}" for value in range(reservation.first_value, end + 1)]
+    return response
+
 @router.get("/forms/{form_id}/next-doc-number")
 async def get_next_doc_number(
     form_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get the next document number for a form"""
-    doc_number = generate_doc_number(form_id, db)
-    return {"doc_number": doc_number}
+    """Get the next document number for a form (a preview; saving the inspection claims it)"""
+    return {"doc_number": preview_doc_number(form_id, db)}
+
+@router.post("/forms/{form_id}/reservations", response_model=DocNumberReservationResponse)
+async def reserve_doc_numbers(
+    form_id: int,
+    reservation: DocNumberReservationCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Reserve a block of consecutive document numbers for an offline device"""
+    if not 1 <= reservation.count <= DOC_NUMBER_MAX_RESERVATION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"count must be between 1 and {DOC_NUMBER_MAX_RESERVATION}"
+        )
+    device_id = reservation.device_id.strip()
+    if not device_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="device_id is required"
+        )
+
+    form = db.query(Form).filter(Form.id == form_id).first()
+    if not form:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form not found"
+        )
+
+    # One sequence update covers the whole block
+    current_year = datetime.now().year
+    last_value = reserve_sequence_values(db, form, current_year, reservation.count)
+    db_reservation = DocNumberReservation(
+        form_id=form_id,
+        year=current_year,
+        device_id=device_id,
+        reserved_by=current_user.id,
+        first_value=last_value - reservation.count + 1,
+        last_value=last_value
+    )
+    db.add(db_reservation)
+    db.commit()
+    db.refresh(db_reservation)
+
+    logger.info(
+        f"Reserved doc numbers {db_reservation.first_value}-{last_value} of form {form_id} "
+        f"for device {device_id} (user {current_user.id})"
+    )
+    return _reservation_response(db_reservation, form)
+
+@router.post("/reservations/{reservation_id}/release", response_model=DocNumberReservationResponse)
+async def release_doc_numbers(
+    reservation_id: int,
+    release: DocNumberReservationRelease,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Release the unused tail of a reservation
+
+    `used_count` numbers from the start of the block are kept. The rest go
+    back to the form's sequence if nothing was issued after this block;
+    otherwise they are only marked unused.
+    """
+    reservation = db.query(DocNumberReservation).filter(DocNumberReservation.id == reservation_id).first()
+    if not reservation or (reservation.reserved_by != current_user.id and current_user.role.value != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reservation not found"
+        )
+    if reservation.released_from is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Reservation has already been released"
+        )
+
+    block_size = reservation.last_value - reservation.first_value + 1
+    if not 0 <= release.used_count <= block_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"used_count must be between 0 and {block_size}"
+        )
+
+    if release.used_count < block_size:
+        release_from = reservation.first_value + release.used_count
+        returned = release_sequence_tail(db, reservation, release_from)
+        reservation.released_from = release_from
+        reservation.released_at = datetime.utcnow()
+        db.commit()
+        db.refresh(reservation)
+        logger.info(
+            f"Released doc numbers {release_from}-{reservation.last_value} of reservation {reservation_id}"
+            f"{' back to the sequence' if returned else ' (not the sequence tail, left unused)'}"
+        )
+
+    form = db.query(Form).filter(Form.id == reservation.form_id).first()
+    return _reservation_response(reservation, form)
@@ -1,24 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from models import User, Form, FormField, InspectionResponse
 from schemas import FormCreate, FormUpdate, FormResponse, FormFieldCreate
 from auth import get_current_user, require_role
 from validators import validate_form_field_before_save, SubformValidationError
+from utils.pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[FormResponse])
 async def get_forms(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all active forms"""
-    forms = db.query(Form).filter(Form.is_active == True).offset(skip).limit(limit).all()
+    """Get all active forms, newest first; see utils.pagination for cursor paging"""
+    query = db.query(Form).filter(Form.is_active == True)
+    forms = paginate(query, Form, skip, limit, cursor).all()
+    set_next_cursor(response, forms, limit)
     return forms
 
 @router.get("/{form_id}", response_model=FormResponse)
@@ -58,6 +64,16 @@ def validate_subform_fields(field_data):
             detail=str(e)
         )
 
+def touch_form(form: Form) -> None:
+    """
+    Mark a form as changed after editing its fields.
+
+    Field edits do not update the forms row by themselves. Export and PDF
+    caches key on the form's updated_at and revision, so this forces the
+    UPDATE that moves both.
+    """
+    form.updated_at = func.now()
+
 @router.post("/", response_model=FormResponse)
 async def create_form(
     form: FormCreate,
@@ -149,6 +165,7 @@ async def update_field_flag_conditions(
         )
     
     field.flag_conditions = flag_conditions
+    touch_form(field.form)
     db.commit()
     db.refresh(field)
     
@@ -195,6 +212,7 @@ async def delete_field_flag_conditions(
         )
     
     field.flag_conditions = None
+    touch_form(field.form)
     db.commit()
     
     return {"message": "Flag conditions removed successfully"}
@@ -251,6 +269,7 @@ async def add_form_field(
     )
     
     db.add(db_field)
+    touch_form(form)
     db.commit()
     db.refresh(db_field)
     
@@ -275,6 +294,7 @@ async def delete_form_field(
             detail="Field not found"
         )
     
+    touch_form(field.form)
     db.delete(field)
     db.commit()
     
@@ -360,6 +380,7 @@ async def update_form_complete(
                 db.delete(field_to_delete)
             # If there are responses, keep the field (don't delete)
     
+    touch_form(form)
     db.commit()
     db.refresh(form)
     
@@ -1,23 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from models import User
 from schemas import UserCreate, UserUpdate, UserResponse
 from auth import get_current_user, require_role, get_password_hash
+from utils.pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(require_role(["admin"])),
     db: Session = Depends(get_db)
 ):
-    """Get all active users (Admin only)"""
-    users = db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+    """Get all active users (Admin only), newest first; see utils.pagination for cursor paging"""
+    query = db.query(User).filter(User.is_active == True)
+    users = paginate(query, User, skip, limit, cursor).all()
+    set_next_cursor(response, users, limit)
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -173,9 +173,14 @@ class InspectionResponse(InspectionBase):
     reviewed_at: Optional[datetime] = None
     rejection_reason: Optional[str] = None
     reviewer_signature: Optional[str] = None
+    doc_number: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     responses: List[InspectionResponseResponse] = []
+    response_count: int = 0
+    flagged_count: int = 0
+    pass_count: int = 0
+    hold_count: int = 0
     has_flags: Optional[bool] = None  # Computed field to indicate if inspection has any flagged responses
     form_name: Optional[str] = None  # Form name for display
     inspector_username: Optional[str] = None  # Inspector username for display
@@ -190,6 +195,7 @@ class DashboardStats(BaseModel):
     accepted_inspections: int
     rejected_inspections: int
     draft_inspections: int
+    flagged_inspections: int = 0
     total_forms: int
 
 class AnalyticsData(BaseModel):
@@ -200,4 +206,26 @@ class AnalyticsResponse(BaseModel):
     daily_inspections: List[AnalyticsData]
     monthly_inspections: List[AnalyticsData]
     inspection_by_status: List[Dict[str, Any]]
-    inspection_by_plant: List[Dict[str, Any]]
\ No newline at end of file
+    inspection_by_plant: List[Dict[str, Any]]
+
+# Doc Number Schemas
+class DocNumberReservationCreate(BaseModel):
+    device_id: str
+    count: int
+
+class DocNumberReservationRelease(BaseModel):
+    used_count: int  # Numbers used from the start of the block; the rest are released
+
+class DocNumberReservationResponse(BaseModel):
+    id: int
+    form_id: int
+    year: int
+    device_id: str
+    first_value: int
+    last_value: int
+    released_from: Optional[int] = None
+    created_at: datetime
+    doc_numbers: List[str] = []
+
+    class Config:
+        from_attributes = True
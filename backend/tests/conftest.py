@@ -0,0 +1,145 @@
+"""
+Shared fixtures for the backend tests.
+
+Tests run against a throwaway SQLite database. DATABASE_URL is set before
+any backend module is imported, and the working directory moves to a temp
+dir so logs and the file caches (relative paths by default) stay out of
+the tree.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix="inspecpro_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db?check_same_thread=false"
+os.environ.setdefault("ENVIRONMENT", "test")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(TEST_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from models import (  # noqa: E402
+    Base,
+    FieldType,
+    Form,
+    FormField,
+    Inspection,
+    InspectionResponse,
+    InspectionStatus,
+    User,
+    UserRole,
+)
+
+
+@pytest.fixture
+def db():
+    """Session on a freshly created schema"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def queries():
+    """SQL statements executed while the test runs (clear() it to start counting)"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def auth_headers(username: str) -> dict:
+    """Bearer token header for a seeded user"""
+    return {"Authorization": "Bearer " + create_access_token({"sub": username})}
+
+
+def form_payload(form, renamed: dict) -> dict:
+    """Body for PUT /api/forms/{id}/complete that keeps the form, renaming fields per renamed"""
+    return {
+        "form_name": form.form_name,
+        "description": form.description,
+        "fields": [
+            {
+                "id": field.id,
+                "field_name": renamed.get(field.field_name, field.field_name),
+                "field_type": field.field_type.value,
+                "field_options": field.field_options or {},
+                "field_order": field.field_order,
+                "flag_conditions": field.flag_conditions,
+            }
+            for field in sorted(form.fields, key=lambda field: field.field_order)
+        ],
+    }
+
+
+def seed_inspections(db, count: int, forms: int = 2) -> None:
+    """
+    Users "admin" and "user", `forms` forms with four fields each, and
+    `count` submitted inspections by "user" spread over the forms.
+    """
+    admin = User(user_id="A1", username="admin", email="admin@example.com", password_hash="x", role=UserRole.admin)
+    user = User(user_id="U1", username="user", email="user@example.com", password_hash="x", role=UserRole.user)
+    db.add_all([admin, user])
+    db.commit()
+
+    seeded_forms = []
+    for form_index in range(forms):
+        form = Form(form_name=f"Graphic Inspection {form_index}", created_by=admin.id)
+        form.fields = [
+            FormField(field_name="No Doc", field_type=FieldType.text, field_order=0),
+            FormField(field_name="Color", field_type=FieldType.dropdown, field_order=1,
+                      field_options={"options": ["red", "blue"]},
+                      flag_conditions={"enabled": True, "abnormal_values": ["red"]}),
+            FormField(field_name="Width", field_type=FieldType.measurement, field_order=2,
+                      flag_conditions={"enabled": True, "min_value": 1, "max_value": 10}),
+            FormField(field_name="Notes", field_type=FieldType.notes, field_order=3),
+        ]
+        seeded_forms.append(form)
+    db.add_all(seeded_forms)
+    db.commit()
+
+    for index in range(count):
+        form = seeded_forms[index % forms]
+        fields = sorted(form.fields, key=lambda field: field.field_order)
+        flagged = index % 3 == 0
+        inspection = Inspection(
+            form_id=form.id,
+            inspector_id=user.id,
+            status=InspectionStatus.submitted,
+            created_at=datetime(2025, 1, 1) + timedelta(hours=index),
+            response_count=4,
+            flagged_count=1 if flagged else 0,
+        )
+        inspection.responses = [
+            InspectionResponse(field_id=fields[0].id, response_value=f"GRA-INS-2025{index + 1}"),
+            InspectionResponse(field_id=fields[1].id, response_value="red" if flagged else "blue", is_flagged=flagged),
+            InspectionResponse(field_id=fields[2].id, measurement_value=5),
+            InspectionResponse(field_id=fields[3].id, response_value="ok"),
+        ]
+        db.add(inspection)
+    db.commit()
@@ -0,0 +1,36 @@
+"""backfill_inspection_counters.py: stored flags are re-evaluated before the counters are rebuilt"""
+
+from conftest import seed_inspections
+from models import Inspection, InspectionResponse
+
+import backfill_inspection_counters
+
+
+def test_backfill_corrects_stale_flags_and_counters(db):
+    seed_inspections(db, 4)
+
+    # Stored before flag evaluation worked: nothing flagged, counters stale
+    db.query(InspectionResponse).update({InspectionResponse.is_flagged: False})
+    db.query(Inspection).update({Inspection.flagged_count: 0, Inspection.response_count: 0})
+    # Width 50 is outside 1..10; a stray flag on "blue" must be cleared
+    db.query(InspectionResponse).filter(
+        InspectionResponse.inspection_id == 2, InspectionResponse.measurement_value.isnot(None)
+    ).update({InspectionResponse.measurement_value: 50})
+    db.query(InspectionResponse).filter(
+        InspectionResponse.inspection_id == 3, InspectionResponse.response_value == "blue"
+    ).update({InspectionResponse.is_flagged: True})
+    db.commit()
+    stamps = {inspection.id: (inspection.updated_at, inspection.revision) for inspection in db.query(Inspection)}
+
+    assert backfill_inspection_counters.backfill_counters(batch_size=3) == 4
+
+    db.expire_all()
+    flagged = {
+        (row.inspection_id, row.response_value or row.measurement_value)
+        for row in db.query(InspectionResponse).filter(InspectionResponse.is_flagged == True)
+    }
+    assert flagged == {(1, "red"), (4, "red"), (2, 50)}
+    counts = {inspection.id: (inspection.flagged_count, inspection.response_count) for inspection in db.query(Inspection)}
+    assert counts == {1: (1, 4), 2: (1, 4), 3: (0, 4), 4: (1, 4)}
+    # A backfill is not an edit: "Updated" timestamps and revisions stay as they were
+    assert {inspection.id: (inspection.updated_at, inspection.revision) for inspection in db.query(Inspection)} == stamps
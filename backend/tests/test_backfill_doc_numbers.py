@@ -0,0 +1,21 @@
+"""backfill_doc_numbers.py: fills doc_number without marking inspections as edited"""
+
+from conftest import seed_inspections
+from models import Inspection
+
+import backfill_doc_numbers
+
+
+def test_backfill_fills_doc_numbers_and_keeps_stamps(db):
+    seed_inspections(db, 4)
+    db.query(Inspection).update({Inspection.doc_number: None})
+    db.commit()
+    stamps = {inspection.id: (inspection.updated_at, inspection.revision) for inspection in db.query(Inspection)}
+
+    assert backfill_doc_numbers.backfill_doc_numbers(batch_size=3) == 4
+
+    db.expire_all()
+    inspections = db.query(Inspection).order_by(Inspection.id).all()
+    assert [inspection.doc_number for inspection in inspections] == [f"GRA-INS-2025{index}" for index in range(1, 5)]
+    # A backfill is not an edit: "Updated" timestamps and revisions stay as they were
+    assert {inspection.id: (inspection.updated_at, inspection.revision) for inspection in inspections} == stamps
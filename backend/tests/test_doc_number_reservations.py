@@ -0,0 +1,92 @@
+"""Doc number reservations for offline devices: reserving a block and releasing its unused tail"""
+
+from datetime import datetime
+
+from conftest import auth_headers, seed_inspections
+from utils.doc_numbers import DOC_NUMBER_MAX_RESERVATION
+
+PREFIX = f"GRA-INS-{datetime.now().year}"
+
+
+def _reserve(client, count, username="user"):
+    return client.post(
+        "/api/doc-numbers/forms/1/reservations", json={"device_id": "tablet-1", "count": count},
+        headers=auth_headers(username)
+    )
+
+
+def _release(client, reservation_id, used_count, username="user"):
+    return client.post(
+        f"/api/doc-numbers/reservations/{reservation_id}/release", json={"used_count": used_count},
+        headers=auth_headers(username)
+    )
+
+
+def _next_doc_number(client):
+    return client.get("/api/doc-numbers/forms/1/next-doc-number", headers=auth_headers("user")).json()["doc_number"]
+
+
+def test_reserve_block(db, client):
+    seed_inspections(db, 2)
+
+    response = _reserve(client, 3)
+    assert response.status_code == 200
+    reservation = response.json()
+    assert (reservation["first_value"], reservation["last_value"]) == (1, 3)
+    assert reservation["doc_numbers"] == [f"{PREFIX}1", f"{PREFIX}2", f"{PREFIX}3"]
+    assert _next_doc_number(client) == f"{PREFIX}4"
+
+    assert _reserve(client, 2).json()["doc_numbers"] == [f"{PREFIX}4", f"{PREFIX}5"]
+
+
+def test_release_tail_returns_numbers_to_the_sequence(db, client):
+    seed_inspections(db, 2)
+    reservation_id = _reserve(client, 5).json()["id"]
+
+    response = _release(client, reservation_id, 2)
+    assert response.status_code == 200
+    assert response.json()["released_from"] == 3
+    assert response.json()["doc_numbers"] == [f"{PREFIX}1", f"{PREFIX}2"]
+    # Nothing was issued after the block, so its tail is issued again
+    assert _next_doc_number(client) == f"{PREFIX}3"
+
+
+def test_release_of_a_block_that_is_not_the_tail_leaves_numbers_unused(db, client):
+    seed_inspections(db, 2)
+    first_id = _reserve(client, 3).json()["id"]
+    _reserve(client, 2)
+
+    response = _release(client, first_id, 1)
+    assert response.status_code == 200
+    assert response.json()["doc_numbers"] == [f"{PREFIX}1"]
+    assert _next_doc_number(client) == f"{PREFIX}6"
+
+
+def test_double_release_is_a_conflict(db, client):
+    seed_inspections(db, 2)
+    reservation_id = _reserve(client, 3).json()["id"]
+
+    assert _release(client, reservation_id, 1).status_code == 200
+    assert _release(client, reservation_id, 1).status_code == 409
+
+
+def test_used_count_and_count_bounds(db, client):
+    seed_inspections(db, 2)
+    reservation_id = _reserve(client, 3).json()["id"]
+
+    assert _release(client, reservation_id, -1).status_code == 400
+    assert _release(client, reservation_id, 4).status_code == 400
+    assert _reserve(client, 0).status_code == 400
+    assert _reserve(client, DOC_NUMBER_MAX_RESERVATION + 1).status_code == 400
+    # Using the whole block releases nothing and keeps it open
+    response = _release(client, reservation_id, 3)
+    assert response.status_code == 200
+    assert response.json()["released_from"] is None
+
+
+def test_only_the_owner_or_an_admin_can_release(db, client):
+    seed_inspections(db, 2)
+    reservation_id = _reserve(client, 3, username="admin").json()["id"]
+
+    assert _release(client, reservation_id, 1, username="user").status_code == 404
+    assert _release(client, reservation_id, 1, username="admin").status_code == 200
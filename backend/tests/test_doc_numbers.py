@@ -0,0 +1,96 @@
+"""Doc numbers: sequence seeding, and how the API rejects bad or duplicate numbers"""
+
+from datetime import datetime
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import IntegrityError
+
+from conftest import auth_headers, seed_inspections
+from models import DocNumberSequence, Form
+from utils.doc_numbers import DOC_NUMBER_MAX_LENGTH, is_doc_number_conflict, reserve_sequence_values, sequence_upsert
+
+
+def test_first_reservation_seeds_from_legacy_numbers(db):
+    # Form 1 holds GRA-INS-20251 and GRA-INS-20253
+    seed_inspections(db, 4)
+    form = db.get(Form, 1)
+
+    assert reserve_sequence_values(db, form, 2025) == 4
+    assert reserve_sequence_values(db, form, 2025, count=5) == 9
+    assert reserve_sequence_values(db, form, 2026) == 1
+    db.commit()
+    assert db.get(DocNumberSequence, (1, 2025)).last_value == 9
+
+
+def test_seed_advances_row_created_by_another_worker(db):
+    seed_inspections(db, 4)
+    form = db.get(Form, 1)
+
+    # Another worker seeded the row after this one found it missing
+    db.add(DocNumberSequence(form_id=1, year=2025, last_value=7))
+    db.flush()
+    db.execute(sequence_upsert("sqlite", form.id, 2025, seed=3, count=2))
+    db.expire_all()
+    assert db.get(DocNumberSequence, (1, 2025)).last_value == 9
+
+
+def test_mysql_seed_is_a_single_upsert():
+    sql = str(sequence_upsert("mysql", 1, 2025, seed=3, count=1).compile(dialect=mysql.dialect()))
+    assert sql.startswith("INSERT INTO doc_number_sequences")
+    assert "ON DUPLICATE KEY UPDATE `last_value` = (doc_number_sequences.`last_value` + %s)" in sql
+
+
+def _create_inspection(client, doc_number):
+    # Field 1 is form 1's "No Doc" field
+    payload = {"form_id": 1, "responses": [{"field_id": 1, "response_value": doc_number}]}
+    return client.post("/api/inspections/", json=payload, headers=auth_headers("user"))
+
+
+def test_duplicate_doc_number_is_a_conflict(db, client):
+    seed_inspections(db, 2)
+
+    assert _create_inspection(client, "GRA-INS-202599").status_code == 200
+    assert _create_inspection(client, "GRA-INS-202599").status_code == 409
+
+
+def test_over_long_doc_number_is_rejected(db, client):
+    seed_inspections(db, 2)
+
+    response = _create_inspection(client, "X" * (DOC_NUMBER_MAX_LENGTH + 1))
+    assert response.status_code == 400
+    assert _create_inspection(client, "X" * DOC_NUMBER_MAX_LENGTH).status_code == 200
+
+
+def test_only_doc_number_index_violations_are_conflicts():
+    def error(message):
+        return IntegrityError("INSERT", {}, Exception(message))
+
+    assert is_doc_number_conflict(error("(1062, \"Duplicate entry 'A-1' for key 'inspections.ux_inspections_doc_number'\")"))
+    assert is_doc_number_conflict(error("UNIQUE constraint failed: inspections.doc_number"))
+    assert not is_doc_number_conflict(error("(1452, 'Cannot add or update a child row: a foreign key constraint fails "
+                                            "(`inspection_responses`, CONSTRAINT FOREIGN KEY (`field_id`) "
+                                            "REFERENCES `form_fields` (`id`))')"))
+
+
+def _next_doc_number(client):
+    response = client.get("/api/doc-numbers/forms/1/next-doc-number", headers=auth_headers("user"))
+    assert response.status_code == 200
+    return response.json()["doc_number"]
+
+
+def test_next_doc_number_is_a_preview_until_an_inspection_claims_it(db, client):
+    # The seeded doc numbers are from 2025; this year's sequence starts empty
+    seed_inspections(db, 4)
+    year = datetime.now().year
+
+    # Selecting the form again (or retrying) does not burn numbers
+    assert _next_doc_number(client) == _next_doc_number(client) == f"GRA-INS-{year}1"
+    assert db.query(DocNumberSequence).count() == 0
+
+    assert _create_inspection(client, f"GRA-INS-{year}1").status_code == 200
+    assert _next_doc_number(client) == f"GRA-INS-{year}2"
+
+    # A typed number further ahead moves the sequence past it; a lower one does not move it back
+    assert _create_inspection(client, f"GRA-INS-{year}7").status_code == 200
+    assert _create_inspection(client, f"GRA-INS-{year}5").status_code == 200
+    assert _next_doc_number(client) == f"GRA-INS-{year}8"
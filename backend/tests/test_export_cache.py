@@ -0,0 +1,107 @@
+"""Export cache keys must change whenever exported data or form fields change"""
+
+import os
+import time
+
+from conftest import auth_headers, form_payload, seed_inspections
+from models import Form, Inspection, InspectionStatus
+from utils.inspection_export import EXCEL_MEDIA_TYPE
+
+
+def _export_csv(client):
+    response = client.get("/api/inspections/export-excel?format=csv&form_id=1", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    return response.content.decode("utf-8-sig")
+
+
+def test_field_rename_invalidates_export_cache(db, client):
+    seed_inspections(db, 4)
+    assert "Notes (notes)" in _export_csv(client)
+
+    form = db.get(Form, 1)
+    response = client.put(
+        "/api/forms/1/complete", json=form_payload(form, {"Notes": "Remarks"}), headers=auth_headers("admin")
+    )
+    assert response.status_code == 200
+
+    header = _export_csv(client).splitlines()[0]
+    assert "Remarks (notes)" in header
+    assert "Notes (notes)" not in header
+
+
+def test_same_second_change_invalidates_export_cache(db, client):
+    seed_inspections(db, 4)
+    first = _export_csv(client)
+
+    # A status change that leaves updated_at (one-second resolution) as it was
+    inspection = db.get(Inspection, 1)
+    updated_at = inspection.updated_at
+    inspection.status = InspectionStatus.accepted
+    inspection.updated_at = updated_at
+    db.commit()
+
+    second = _export_csv(client)
+    assert second != first
+    assert "accepted" in second.lower()
+
+
+def _cache_entries():
+    """Export cache entries by path with their inode; a re-render replaces the file (new inode)"""
+    from utils.export_cache import export_cache
+
+    if not os.path.isdir(export_cache.directory):
+        return {}
+    return {entry.path: entry.inode() for entry in os.scandir(export_cache.directory)}
+
+
+def test_export_job_shares_cache_with_endpoint(db, client):
+    seed_inspections(db, 4)
+    _export_csv(client)
+    entries = _cache_entries()
+    assert entries
+
+    # The job renders in a render pool worker, so it can only be observed through the cache
+    response = client.post("/api/inspections/exports?format=csv&form_id=1", headers=auth_headers("admin"))
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    for _ in range(100):
+        job = client.get(f"/api/inspections/exports/{job_id}", headers=auth_headers("admin")).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+    assert job["status"] == "completed", job.get("error")
+
+    # Served from the endpoint's entry: no new entry and the existing one not rewritten
+    assert _cache_entries() == entries
+
+
+def test_large_xlsx_export_is_not_sharded_by_default(db, client):
+    seed_inspections(db, 6)
+    response = client.get("/api/inspections/export-excel?max_rows=2", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(EXCEL_MEDIA_TYPE)
+
+    response = client.get("/api/inspections/export-excel?max_rows=2&shard_by=rows", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+
+def test_exports_larger_than_the_cache_are_still_served(db, client, monkeypatch):
+    import glob
+    import tempfile
+
+    from utils.export_cache import export_cache
+
+    seed_inspections(db, 6)
+    monkeypatch.setattr(export_cache, "max_bytes", 1000)
+    entries = set(glob.glob(os.path.join(export_cache.directory, "*")))
+
+    for query in ("format=csv", "streaming=true", "max_rows=2&shard_by=rows"):
+        response = client.get(f"/api/inspections/export-excel?{query}", headers=auth_headers("admin"))
+        assert response.status_code == 200, query
+        assert len(response.content) > 1000, query
+
+    # Nothing oversized was cached, and the served temp files were removed
+    assert set(glob.glob(os.path.join(export_cache.directory, "*"))) <= entries
+    assert glob.glob(os.path.join(tempfile.gettempdir(), "inspections_export_*")) == []
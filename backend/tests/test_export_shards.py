@@ -0,0 +1,46 @@
+"""Sharded exports: planning, rendering and zip packing all go through the render pool"""
+
+import io
+import json
+import zipfile
+
+from conftest import auth_headers, seed_inspections
+from utils import export_shards
+
+
+def _sharded_export(client, monkeypatch, shard_by):
+    pooled = []
+    run_in_render_pool = export_shards.run_in_render_pool
+
+    async def recording_run_in_render_pool(fn, *args):
+        pooled.append(fn.__name__)
+        return await run_in_render_pool(fn, *args)
+
+    monkeypatch.setattr(export_shards, "run_in_render_pool", recording_run_in_render_pool)
+    response = client.get(
+        f"/api/inspections/export-excel?format=csv&max_rows=2&shard_by={shard_by}", headers=auth_headers("admin")
+    )
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    return json.loads(archive.read("manifest.json")), archive.namelist(), pooled
+
+
+def test_row_shards(db, client, monkeypatch):
+    seed_inspections(db, 5)
+
+    manifest, names, pooled = _sharded_export(client, monkeypatch, "rows")
+    assert [shard["rows"] for shard in manifest["files"]] == [2, 2, 1]
+    assert manifest["total_rows"] == 5
+    assert sorted(names) == ["inspections_part-001.csv", "inspections_part-002.csv", "inspections_part-003.csv",
+                             "manifest.json"]
+    assert pooled == ["plan_shards"] + ["render_export_shard"] * 3 + ["pack_export_shards"]
+
+
+def test_month_shards_are_split_by_row_budget(db, client, monkeypatch):
+    # All seeded inspections fall in January 2025
+    seed_inspections(db, 3)
+
+    manifest, _names, _pooled = _sharded_export(client, monkeypatch, "month")
+    assert [(shard["label"], shard["rows"]) for shard in manifest["files"]] == [
+        ("2025-01-part-001", 2), ("2025-01-part-002", 1)
+    ]
@@ -0,0 +1,55 @@
+"""Incremental export watermarks must not skip rows changed around the watermark"""
+
+from datetime import datetime, timedelta
+
+from conftest import auth_headers, seed_inspections
+from models import Inspection
+
+WATERMARK_HEADER = "X-Next-Watermark"
+
+
+def _pull(client, since=None):
+    url = "/api/inspections/export-excel?format=csv"
+    if since:
+        url += f"&since={since}"
+    return client.get(url, headers=auth_headers("admin"))
+
+
+def _exported_ids(response):
+    lines = response.content.decode("utf-8-sig").splitlines()[1:]
+    return {int(line.split(",", 1)[0]) for line in lines}
+
+
+def _set_updated_at(db, updated_at):
+    db.query(Inspection).update({Inspection.updated_at: updated_at}, synchronize_session=False)
+    db.commit()
+
+
+def test_settled_rows_get_exact_watermark(db, client):
+    seed_inspections(db, 3)
+    _set_updated_at(db, datetime.utcnow() - timedelta(hours=1))
+
+    first = _pull(client)
+    assert _exported_ids(first) == {1, 2, 3}
+
+    second = _pull(client, first.headers[WATERMARK_HEADER])
+    assert second.status_code == 204
+
+
+def test_same_second_change_to_lower_id_is_not_skipped(db, client):
+    seed_inspections(db, 3)
+    changed_at = datetime.utcnow().replace(microsecond=0)
+    _set_updated_at(db, changed_at)
+
+    first = _pull(client)
+    assert _exported_ids(first) == {1, 2, 3}
+
+    # Inspection 1 changes again within the same second as the watermark row (id 3)
+    inspection = db.get(Inspection, 1)
+    inspection.rejection_reason = "changed"
+    inspection.updated_at = changed_at
+    db.commit()
+
+    second = _pull(client, first.headers[WATERMARK_HEADER])
+    assert second.status_code == 200
+    assert 1 in _exported_ids(second)
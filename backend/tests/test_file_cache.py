@@ -0,0 +1,42 @@
+"""FileCache: puts scan the directory only when the size estimate needs it"""
+
+import os
+
+from utils.file_cache import FileCache
+
+
+def _count_scans(cache, monkeypatch):
+    scans = []
+    evict = cache.evict
+
+    def counting_evict(keep=None):
+        scans.append(keep)
+        evict(keep)
+
+    monkeypatch.setattr(cache, "evict", counting_evict)
+    return scans
+
+
+def test_puts_under_budget_scan_once(tmp_path, monkeypatch):
+    cache = FileCache(str(tmp_path), max_bytes=100_000)
+    scans = _count_scans(cache, monkeypatch)
+
+    for index in range(100):
+        cache.put_bytes(f"photo-{index}", b"x" * 500, ".img")
+
+    assert len(scans) == 1
+    assert len(os.listdir(tmp_path)) == 100
+
+
+def test_going_over_budget_evicts_oldest_and_keeps_the_new_entry(tmp_path, monkeypatch):
+    cache = FileCache(str(tmp_path), max_bytes=2_000)
+    scans = _count_scans(cache, monkeypatch)
+
+    for index in range(5):
+        path = cache.put_bytes(f"photo-{index}", b"x" * 500, ".img")
+        os.utime(path, (index, index))
+
+    assert len(scans) == 2
+    assert cache.get("photo-0", ".img") is None
+    assert all(cache.get(f"photo-{index}", ".img") for index in range(1, 5))
+    assert cache.put_bytes("too-big", b"x" * 2_001, ".img") is None
@@ -0,0 +1,63 @@
+"""Cursor pagination of the list endpoints"""
+
+from datetime import datetime
+
+from conftest import auth_headers, seed_inspections
+from models import Form, Inspection
+from utils.pagination import NEXT_CURSOR_HEADER
+
+
+def _pages(client, url, limit):
+    """Follow X-Next-Cursor from the first page; returns the id lists and the last response"""
+    pages = []
+    response = client.get(f"{url}?limit={limit}", headers=auth_headers("admin"))
+    while True:
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages, response
+        response = client.get(f"{url}?limit={limit}&cursor={cursor}", headers=auth_headers("admin"))
+
+
+def test_cursor_pages_cover_every_row_once_newest_first(db, client):
+    seed_inspections(db, 5)
+
+    pages, last = _pages(client, "/api/inspections/", 2)
+    assert pages == [[5, 4], [3, 2], [1]]
+    assert NEXT_CURSOR_HEADER not in last.headers
+
+
+def test_cursor_breaks_created_at_ties_by_id(db, client):
+    seed_inspections(db, 5)
+    db.query(Inspection).update({Inspection.created_at: datetime(2025, 1, 1)})
+    db.commit()
+
+    pages, _ = _pages(client, "/api/inspections/", 2)
+    assert pages == [[5, 4], [3, 2], [1]]
+
+
+def test_full_last_page_is_followed_by_an_empty_one(db, client):
+    seed_inspections(db, 4)
+
+    pages, last = _pages(client, "/api/inspections/", 2)
+    assert pages == [[4, 3], [2, 1], []]
+    assert NEXT_CURSOR_HEADER not in last.headers
+
+
+def test_skip_limit_pages_forms_newest_first(db, client):
+    seed_inspections(db, 1, forms=3)
+    db.query(Form).update({Form.created_at: datetime(2025, 1, 1)})
+    db.commit()
+
+    response = client.get("/api/forms/?skip=1&limit=1", headers=auth_headers("admin"))
+    assert [form["id"] for form in response.json()] == [2]
+
+
+def test_malformed_cursor_is_rejected(db, client):
+    seed_inspections(db, 1)
+
+    for cursor in ("not-a-cursor", "eyJjIjoieCJ9"):
+        response = client.get(f"/api/inspections/?cursor={cursor}", headers=auth_headers("admin"))
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,69 @@
+"""PDF report export: bulk packing, cap and cache validators"""
+
+import io
+import zipfile
+
+from pypdf import PdfReader
+
+from conftest import auth_headers, form_payload, seed_inspections
+from models import Form, Inspection, InspectionStatus
+
+
+def test_bulk_pdf_export_zip_and_merge(db, client):
+    seed_inspections(db, 3)
+
+    response = client.get("/api/inspections/export-pdf?form_id=1", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert sorted(names) == ["inspection_1.pdf", "inspection_3.pdf"]
+
+    response = client.get("/api/inspections/export-pdf?merge=true", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert len(PdfReader(io.BytesIO(response.content)).pages) >= 3
+
+
+def test_bulk_pdf_export_cap(db, client, monkeypatch):
+    from utils import pdf_report
+
+    seed_inspections(db, 3)
+    monkeypatch.setattr(pdf_report, "PDF_BULK_MAX_INSPECTIONS", 2)
+
+    response = client.get("/api/inspections/export-pdf", headers=auth_headers("admin"))
+    assert response.status_code == 400
+
+
+def _pdf_etag(client, inspection_id=1):
+    response = client.get(f"/api/inspections/{inspection_id}/export-pdf", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_field_rename_changes_pdf_etag(db, client):
+    seed_inspections(db, 2)
+    etag = _pdf_etag(client)
+
+    form = db.get(Form, 1)
+    response = client.put(
+        "/api/forms/1/complete", json=form_payload(form, {"Notes": "Remarks"}), headers=auth_headers("admin")
+    )
+    assert response.status_code == 200
+
+    assert _pdf_etag(client) != etag
+    response = client.get(
+        "/api/inspections/1/export-pdf", headers={**auth_headers("admin"), "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+def test_same_second_change_changes_pdf_etag(db, client):
+    seed_inspections(db, 2)
+    etag = _pdf_etag(client)
+
+    # A status change that leaves updated_at (one-second resolution) as it was
+    inspection = db.get(Inspection, 1)
+    updated_at = inspection.updated_at
+    inspection.status = InspectionStatus.accepted
+    inspection.updated_at = updated_at
+    db.commit()
+
+    assert _pdf_etag(client) != etag
@@ -0,0 +1,67 @@
+"""Query-count regression tests: list pages and exports must not issue per-row queries"""
+
+import pytest
+
+from conftest import auth_headers, seed_inspections
+
+# get_current_user loads the caller once per request
+AUTH_QUERIES = 1
+
+
+@pytest.mark.parametrize("count", [5, 60])
+def test_inspection_list_page_query_count(db, client, queries, count):
+    seed_inspections(db, count)
+
+    queries.clear()
+    response = client.get(f"/api/inspections/?limit={count}", headers=auth_headers("admin"))
+
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page) == count
+    assert all(item["form_name"] and item["inspector_username"] == "user" for item in page)
+    # One query for the page (with form name and inspector joined), one for its responses
+    assert len(queries) == AUTH_QUERIES + 2, f"inspection list page of {count}: {len(queries)} queries"
+
+
+@pytest.mark.parametrize("count", [5, 60])
+def test_my_inspections_page_query_count(db, client, queries, count):
+    seed_inspections(db, count)
+
+    queries.clear()
+    response = client.get(f"/api/inspections/my-inspections?limit={count}", headers=auth_headers("user"))
+
+    assert response.status_code == 200
+    assert len(response.json()) == count
+    assert len(queries) == AUTH_QUERIES + 2, f"my-inspections page of {count}: {len(queries)} queries"
+
+
+
+def _build_workbook(db, queries, chunk_size):
+    """Build the export workbook for all inspections, counting only the export's own queries"""
+    from utils.inspection_export import build_export_query, build_workbook, parse_export_filters
+
+    filters = parse_export_filters(None, None, None, None, None)
+    query = build_export_query(db, filters)
+    queries.clear()
+    return build_workbook(db, query, filters, chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize("count", [5, 60])
+def test_build_workbook_query_count(db, queries, count):
+    seed_inspections(db, count)
+
+    workbook = _build_workbook(db, queries, chunk_size=500)
+
+    assert workbook["📋 Detailed Data"].max_row == count + 1
+    # Forms, form fields, the streamed inspections, then one response and one user query for the single chunk
+    assert len(queries) == 5, f"workbook of {count} inspections: {len(queries)} queries"
+
+
+def test_build_workbook_query_count_per_chunk(db, queries):
+    seed_inspections(db, 60)
+
+    workbook = _build_workbook(db, queries, chunk_size=10)
+
+    assert workbook["📋 Detailed Data"].max_row == 61
+    # Six chunks: one response query each; every inspector is already known after the first chunk
+    assert len(queries) == 3 + 6 + 1, f"workbook of 60 inspections in chunks of 10: {len(queries)} queries"
@@ -0,0 +1,229 @@
+"""
+Document number helpers.
+
+Doc numbers have the form ABBR-YYYYN, where ABBR comes from the form name,
+YYYY is the year and N the form's sequence for that year (no zero padding).
+Sequences live in doc_number_sequences and are advanced atomically; each
+inspection stores its number in Inspection.doc_number, taken from the
+"No Doc" field response. The next number is only previewed for the form
+page; saving an inspection claims it, moving the sequence past it.
+Offline devices can reserve a whole block of values at once
+(doc_number_reservations) and release the unused tail.
+"""
+
+import os
+import re
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import DocNumberReservation, DocNumberSequence, Form, FormField, Inspection, InspectionResponse
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Field names (lowercase substrings) that mark a form's document number field
+DOC_NUMBER_FIELD_NAMES = ("no doc", "no. doc")
+
+# Longest doc number Inspection.doc_number (String(100)) can hold
+DOC_NUMBER_MAX_LENGTH = 100
+
+# Unique index on Inspection.doc_number
+DOC_NUMBER_INDEX = "ux_inspections_doc_number"
+
+# Largest value doc_number_sequences.last_value (INTEGER) can hold
+DOC_NUMBER_MAX_SEQUENCE = 2 ** 31 - 1
+
+# Largest block of doc numbers one reservation may take
+DOC_NUMBER_MAX_RESERVATION = int(os.getenv("DOC_NUMBER_MAX_RESERVATION", "500"))
+
+
+def form_abbreviation(form: Form) -> str:
+    """
+    Abbreviation from the first two words only (3 letters each), sanitized, hyphenated.
+    Example: "Graphic Inspection Report" -> "GRA-INS"
+    """
+    tokens = re.findall(r"[A-Za-z0-9]+", (form.form_name or "").upper())
+    part1 = tokens[0][:3] if len(tokens) >= 1 else "DOC"
+    part2 = tokens[1][:3] if len(tokens) >= 2 else None
+    return '-'.join([p for p in [part1, part2] if p])
+
+
+def doc_number_prefix(form: Form, year: int) -> str:
+    """Document number prefix for a form and year: FORMABBR-YYYY"""
+    return f"{form_abbreviation(form)}-{year}"
+
+
+def parse_doc_sequence(doc_number: str, year: int) -> Optional[int]:
+    """
+    Extract the sequence from a doc number, or None if it cannot be parsed.
+
+    Format: ABBR-YYYYN (or messy legacy like ABBR-YYYYYYYY...NNNN).
+    Take the substring after the last '-' and strip all leading occurrences of the year.
+    Example correct:  "20253"        -> year=2025, tail="3"
+    Example legacy:   "202520250004" -> year=2025, tail="0004"
+    """
+    number_part = doc_number.split('-')[-1]
+    year_str = str(year)
+    # Remove all repeated year prefixes at the start
+    while number_part.startswith(year_str):
+        number_part = number_part[len(year_str):]
+    # If empty after stripping, treat as 0; allow leading zeros
+    try:
+        return int(number_part or "0")
+    except ValueError:
+        logger.warning(f"Error parsing doc number {doc_number}")
+        return None
+
+
+def is_doc_number_field(field: FormField) -> bool:
+    """True for the form field that holds the inspection's document number"""
+    name = (field.field_name or "").lower()
+    return any(marker in name for marker in DOC_NUMBER_FIELD_NAMES)
+
+
+def find_doc_number(
+    form: Form,
+    fields_by_id: dict,
+    responses: Iterable[Tuple[Optional[int], Optional[str]]]
+) -> Optional[str]:
+    """
+    Pick an inspection's doc number from its (field_id, response_value) pairs.
+
+    The "No Doc" field wins; otherwise, as in the legacy generator, any
+    response that looks like ABBR-YYYYN for this form is taken. Raises
+    ValueError if the "No Doc" value is longer than DOC_NUMBER_MAX_LENGTH.
+    """
+    legacy_pattern = re.compile(re.escape(form_abbreviation(form)) + r"-\d{5,}")
+    legacy_match = None
+    for field_id, value in responses:
+        value = (value or "").strip()
+        if not value:
+            continue
+        field = fields_by_id.get(field_id)
+        if field is not None and is_doc_number_field(field):
+            if len(value) > DOC_NUMBER_MAX_LENGTH:
+                raise ValueError(f"Document number is longer than {DOC_NUMBER_MAX_LENGTH} characters")
+            return value
+        if legacy_match is None and len(value) <= DOC_NUMBER_MAX_LENGTH and legacy_pattern.fullmatch(value):
+            legacy_match = value
+    return legacy_match
+
+
+def is_doc_number_conflict(error: IntegrityError) -> bool:
+    """True if an IntegrityError is a duplicate Inspection.doc_number (MySQL or SQLite wording)"""
+    message = str(error.orig)
+    return DOC_NUMBER_INDEX in message or "inspections.doc_number" in message
+
+
+def legacy_max_sequence(db: Session, form_id: int, prefix: str, year: int) -> int:
+    """Highest sequence among the doc numbers stored as responses of a form's inspections"""
+    doc_numbers = db.query(InspectionResponse.response_value).join(
+        Inspection, Inspection.id == InspectionResponse.inspection_id
+    ).filter(
+        Inspection.form_id == form_id,
+        InspectionResponse.response_value.like(f"{prefix}%")
+    ).all()
+
+    sequences = [parse_doc_sequence(value, year) for (value,) in doc_numbers if value.startswith(prefix)]
+    return max((sequence for sequence in sequences if sequence is not None), default=0)
+
+
+def sequence_upsert(dialect: str, form_id: int, year: int, seed: int, count: int):
+    """INSERT creating the (form, year) row at seed + count, or advancing an existing row by count"""
+    values = {"form_id": form_id, "year": year, "last_value": seed + count}
+    increment = {"last_value": DocNumberSequence.last_value + count, "updated_at": func.now()}
+
+    if dialect == "mysql":
+        return mysql_insert(DocNumberSequence).values(**values).on_duplicate_key_update(**increment)
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    return insert(DocNumberSequence).values(**values).on_conflict_do_update(
+        index_elements=[DocNumberSequence.form_id, DocNumberSequence.year], set_=increment
+    )
+
+
+def reserve_sequence_values(db: Session, form: Form, year: int, count: int = 1) -> int:
+    """
+    Atomically advance the (form, year) sequence by `count` and return its new last value.
+
+    The UPDATE takes a row lock that is held until the caller commits, so
+    concurrent callers on any worker always get distinct values. A missing
+    row is seeded from the legacy doc numbers of the form with a single
+    upsert. The existence check is a plain read: on InnoDB an UPDATE of a
+    missing row takes a gap lock, and two first callers holding one would
+    deadlock on their INSERTs.
+    """
+    sequence_query = db.query(DocNumberSequence).filter(
+        DocNumberSequence.form_id == form.id,
+        DocNumberSequence.year == year
+    )
+    increment = {DocNumberSequence.last_value: DocNumberSequence.last_value + count}
+
+    exists = sequence_query.with_entities(DocNumberSequence.last_value).first() is not None
+    if not exists or not sequence_query.update(increment, synchronize_session=False):
+        seed = legacy_max_sequence(db, form.id, doc_number_prefix(form, year), year)
+        logger.info(f"Seeding doc number sequence for form {form.id}, {year} at {seed}")
+        # If another worker seeded the row first, this advances it instead
+        db.execute(sequence_upsert(db.get_bind().dialect.name, form.id, year, seed, count))
+
+    return sequence_query.with_entities(DocNumberSequence.last_value).scalar()
+
+
+def peek_sequence_value(db: Session, form: Form, year: int) -> int:
+    """Next value of the (form, year) sequence, without consuming it"""
+    last_value = db.query(DocNumberSequence.last_value).filter(
+        DocNumberSequence.form_id == form.id,
+        DocNumberSequence.year == year
+    ).scalar()
+    if last_value is None:
+        last_value = legacy_max_sequence(db, form.id, doc_number_prefix(form, year), year)
+    return last_value + 1
+
+
+def claim_doc_number(db: Session, form: Form, doc_number: Optional[str], year: int) -> None:
+    """
+    Move the (form, year) sequence up to the doc number an inspection is saved with.
+
+    This is where previewed numbers are consumed. Numbers with another
+    prefix, or at or below the sequence, leave it alone; a duplicate is
+    caught by the unique index on Inspection.doc_number when the caller
+    commits. Seeding uses the same plain read plus upsert as
+    reserve_sequence_values, so first claims do not take InnoDB gap locks.
+    """
+    if not doc_number or not doc_number.startswith(doc_number_prefix(form, year)):
+        return
+    value = parse_doc_sequence(doc_number, year)
+    if value is None or not 0 < value <= DOC_NUMBER_MAX_SEQUENCE:
+        return
+
+    sequence_query = db.query(DocNumberSequence).filter(
+        DocNumberSequence.form_id == form.id,
+        DocNumberSequence.year == year
+    )
+    if sequence_query.with_entities(DocNumberSequence.last_value).first() is None:
+        seed = legacy_max_sequence(db, form.id, doc_number_prefix(form, year), year)
+        db.execute(sequence_upsert(db.get_bind().dialect.name, form.id, year, seed, 0))
+    sequence_query.filter(DocNumberSequence.last_value < value).update(
+        {DocNumberSequence.last_value: value}, synchronize_session=False
+    )
+
+
+def release_sequence_tail(db: Session, reservation: DocNumberReservation, release_from: int) -> bool:
+    """
+    Hand values release_from..last_value of a reservation back to the sequence.
+
+    Only possible while the reservation is still the tail of its sequence
+    (nothing was issued after it); the conditional UPDATE makes that check
+    and the rollback one atomic step. Returns whether the values were
+    returned. Otherwise they simply stay unused.
+    """
+    return bool(db.query(DocNumberSequence).filter(
+        DocNumberSequence.form_id == reservation.form_id,
+        DocNumberSequence.year == reservation.year,
+        DocNumberSequence.last_value == reservation.last_value
+    ).update({DocNumberSequence.last_value: release_from - 1}, synchronize_session=False))
@@ -0,0 +1,90 @@
+"""
+Cache for generated inspection export files.
+
+Entries are keyed by the export format, the validated filters, the role
+scope and a data watermark for the matching rows and their forms (row
+count, highest id, latest updated_at and the sum of revision counters).
+Every UPDATE bumps a row's revision, and editing a form's fields bumps the
+form, so identical requests are served from disk until anything exported
+changes, even within the same second.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import Form, Inspection
+from .file_cache import FileCache
+
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", os.path.join("cache", "exports"))
+EXPORT_CACHE_MAX_MB = int(os.getenv("EXPORT_CACHE_MAX_MB", "512"))
+EXPORT_CACHE_MAX_AGE_HOURS = int(os.getenv("EXPORT_CACHE_MAX_AGE_HOURS", "24"))
+
+export_cache = FileCache(
+    EXPORT_CACHE_DIR,
+    max_bytes=EXPORT_CACHE_MAX_MB * 1024 * 1024,
+    max_age_seconds=EXPORT_CACHE_MAX_AGE_HOURS * 3600
+)
+
+
+def export_variant(layout: str, shard_by: Optional[str] = None, max_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Output options that change an export's file for the same data.
+
+    The export endpoint and background jobs both build their cache keys
+    from this, so an export made one way is served to the other.
+    """
+    return {"layout": layout, "shard_by": shard_by, "max_rows": max_rows if shard_by else None}
+
+
+def export_cache_key(
+    db: Session,
+    query,
+    export_format: str,
+    filters: Dict[str, Any],
+    scope_user_id: Optional[int],
+    variant: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build the cache key for an export.
+
+    Raises 404 when the filters match no inspections, so callers can use the
+    watermark query as their emptiness check.
+    """
+    base_query = query.order_by(None)
+    last_updated, row_count, last_id, revisions = base_query.with_entities(
+        func.max(Inspection.updated_at),
+        func.count(Inspection.id),
+        func.max(Inspection.id),
+        func.sum(Inspection.revision)
+    ).one()
+
+    if not row_count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No inspections found with the specified filters"
+        )
+
+    form_ids = base_query.with_entities(Inspection.form_id).distinct().subquery()
+    forms_updated, form_revisions = db.query(
+        func.max(Form.updated_at), func.sum(Form.revision)
+    ).filter(Form.id.in_(form_ids.select())).one()
+
+    return json.dumps({
+        "format": export_format,
+        "filters": filters,
+        "scope_user_id": scope_user_id,
+        "variant": variant or {},
+        "watermark": [
+            last_updated.isoformat() if last_updated else None,
+            row_count,
+            last_id,
+            int(revisions or 0),
+            forms_updated.isoformat() if forms_updated else None,
+            int(form_revisions or 0),
+        ],
+    }, sort_keys=True)
@@ -0,0 +1,185 @@
+"""
+Background export jobs.
+
+Large exports are queued instead of running inside the request. A small
+thread pool schedules jobs (at most EXPORT_JOB_WORKERS at a time) and the
+file itself is written in the render process pool, so openpyxl/CSV/Parquet
+work never holds the API process's GIL. Each job writes its output and a
+small JSON status record into EXPORT_DIR, so any API worker process can
+report progress and serve the finished file, not only the one that
+accepted the job.
+"""
+
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+from database import SessionLocal
+from .export_cache import export_cache, export_cache_key, export_variant
+from .inspection_export import EXPORT_FORMATS, build_export_query, export_writer, next_export_watermark
+from .logging_config import get_logger
+from .render_pool import get_render_pool
+
+logger = get_logger(__name__)
+
+# Directory holding job status records and finished export files
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+
+# Number of exports allowed to run at the same time from this process
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+
+# Finished jobs (and their files) are removed after this many hours
+EXPORT_JOB_TTL_HOURS = int(os.getenv("EXPORT_JOB_TTL_HOURS", "24"))
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix="export-job")
+
+
+def _job_record_path(job_id: str) -> str:
+    return os.path.join(EXPORT_DIR, f"{job_id}.json")
+
+
+def job_file_path(job: Dict[str, Any]) -> str:
+    """Path of the output file produced by a job"""
+    return os.path.join(EXPORT_DIR, job["job_id"] + EXPORT_FORMATS[job["export_format"]]["extension"])
+
+
+def _save_job(job: Dict[str, Any]) -> None:
+    """Write the job record atomically so readers never see a partial file"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    tmp_path = _job_record_path(job["job_id"]) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(job, f)
+    os.replace(tmp_path, _job_record_path(job["job_id"]))
+
+
+def get_export_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Load a job record, or None if the id is unknown or malformed"""
+    if not JOB_ID_PATTERN.match(job_id):
+        return None
+    try:
+        with open(_job_record_path(job_id), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def purge_expired_jobs() -> None:
+    """Remove job records and files older than EXPORT_JOB_TTL_HOURS"""
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - EXPORT_JOB_TTL_HOURS * 3600
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove expired export file {path}: {e}")
+
+
+def submit_export_job(
+    filters: Dict[str, Any],
+    scope_user_id: Optional[int],
+    owner_id: int,
+    export_format: str = "xlsx",
+    layout: str = "combined"
+) -> Dict[str, Any]:
+    """Queue an export and return its initial job record"""
+    purge_expired_jobs()
+
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "status": "queued",
+        "export_format": export_format,
+        "layout": layout,
+        "filters": filters,
+        "scope_user_id": scope_user_id,
+        "owner_id": owner_id,
+        "total": None,
+        "processed": 0,
+        "progress": 0,
+        "error": None,
+        "next_watermark": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "finished_at": None,
+    }
+    _save_job(job)
+    # The worker gets its own copy; the caller's record is the queued snapshot
+    _executor.submit(_run_export_job, dict(job))
+
+    logger.info(f"Queued {export_format} export job {job['job_id']} for user {owner_id}")
+    return job
+
+
+def render_export_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a job's export file (runs in a render pool worker).
+
+    Progress is written straight into the job record. Returns the job with
+    its final counts and next watermark.
+    """
+    db = SessionLocal()
+    output_path = job_file_path(job)
+    tmp_path = output_path + ".part"
+
+    def report_progress(processed: int, total: int) -> None:
+        job["processed"] = processed
+        job["total"] = total
+        job["progress"] = int(processed * 100 / total) if total else 100
+        _save_job(job)
+
+    try:
+        query = build_export_query(db, job["filters"], job["scope_user_id"])
+        job["next_watermark"] = next_export_watermark(query, job["filters"])
+        extension = EXPORT_FORMATS[job["export_format"]]["extension"]
+        cache_key = export_cache_key(
+            db, query, job["export_format"], job["filters"], job["scope_user_id"], export_variant(job["layout"])
+        )
+        cached_path = export_cache.get(cache_key, extension)
+
+        if cached_path:
+            shutil.copyfile(cached_path, tmp_path)
+        else:
+            report_progress(0, query.order_by(None).count())
+            writer = export_writer(job["export_format"], job["layout"])
+            writer(db, query, job["filters"], tmp_path, progress=report_progress)
+            export_cache.put_file(cache_key, tmp_path, extension)
+        os.replace(tmp_path, output_path)
+        return job
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        db.close()
+
+
+def _run_export_job(job: Dict[str, Any]) -> None:
+    """Scheduler thread entry point: run the job in the render pool and record the outcome"""
+    try:
+        job["status"] = "running"
+        _save_job(job)
+
+        # The thread only waits here; the export is written in a worker process
+        job = get_render_pool().submit(render_export_job, job).result()
+
+        job["status"] = "completed"
+        job["progress"] = 100
+        logger.info(f"Export job {job['job_id']} completed ({job['processed']} inspections)")
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Export job {job['job_id']} failed: {e}")
+    finally:
+        job["finished_at"] = datetime.utcnow().isoformat()
+        _save_job(job)
@@ -0,0 +1,204 @@
+"""
+Sharded exports.
+
+Exports too large for one workbook (Excel stops at 1,048,576 rows) are
+split into shards, by row budget or by calendar month, and each shard is
+rendered in the render process pool. The shard files are returned in one
+zip archive together with a manifest.json describing every file. Planning
+(count and boundary queries) and zip packing run in the pool as well, so
+the event loop only awaits.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+
+from database import SessionLocal
+from models import Inspection
+from .inspection_export import EXPORT_FORMATS, build_export_query, export_writer
+from .logging_config import get_logger
+from .render_pool import run_in_render_pool
+
+logger = get_logger(__name__)
+
+# Excel's sheet row limit, minus the header row
+EXCEL_MAX_DATA_ROWS = 1048575
+
+# Default number of inspections per shard
+EXPORT_SHARD_MAX_ROWS = int(os.getenv("EXPORT_SHARD_MAX_ROWS", "100000"))
+
+SHARD_MODES = ("rows", "month")
+
+ZIP_MEDIA_TYPE = "application/zip"
+
+
+def parse_shard_by(shard_by: Optional[str]) -> Optional[str]:
+    """Validate the shard_by parameter"""
+    if shard_by and shard_by not in SHARD_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid shard_by. Must be one of: {', '.join(SHARD_MODES)}"
+        )
+    return shard_by or None
+
+
+def apply_shard_bounds(query, shard: Dict[str, Any]):
+    """Restrict an export query to one shard's created_at and id range"""
+    if shard.get("created_from"):
+        query = query.filter(Inspection.created_at >= datetime.fromisoformat(shard["created_from"]))
+    if shard.get("created_to"):
+        query = query.filter(Inspection.created_at < datetime.fromisoformat(shard["created_to"]))
+    if shard.get("min_id") is not None:
+        query = query.filter(Inspection.id >= shard["min_id"])
+    if shard.get("max_id") is not None:
+        query = query.filter(Inspection.id < shard["max_id"])
+    return query
+
+
+def _split_by_rows(query, row_count: int, max_rows: int, shard: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Split one shard into id ranges of at most max_rows inspections"""
+    if row_count <= max_rows:
+        return [dict(shard, label=shard.get("label") or "part-001")]
+
+    # Id at the start of every following part; one indexed lookup per boundary
+    id_query = apply_shard_bounds(query, shard).order_by(None).with_entities(Inspection.id).order_by(Inspection.id)
+    boundaries = [
+        id_query.offset(offset).limit(1).scalar()
+        for offset in range(max_rows, row_count, max_rows)
+    ]
+
+    parts = []
+    lower = None
+    for part_num, upper in enumerate(boundaries + [None], 1):
+        label = f"{shard['label']}-part-{part_num:03d}" if shard.get("label") else f"part-{part_num:03d}"
+        parts.append(dict(shard, label=label, min_id=lower, max_id=upper))
+        lower = upper
+    return parts
+
+
+def plan_export_shards(query, shard_by: str, max_rows: int) -> List[Dict[str, Any]]:
+    """
+    Plan the shards for an export.
+
+    Month shards that still exceed max_rows are split further by id range,
+    so no shard ever goes over the row budget.
+    """
+    base_query = query.order_by(None)
+
+    if shard_by == "rows":
+        return _split_by_rows(query, base_query.count(), max_rows, {})
+
+    year = func.extract('year', Inspection.created_at)
+    month = func.extract('month', Inspection.created_at)
+    month_counts = base_query.with_entities(year, month, func.count(Inspection.id)).group_by(
+        year, month
+    ).order_by(year, month).all()
+
+    shards = []
+    for year_value, month_value, count in month_counts:
+        month_start = datetime(int(year_value), int(month_value), 1)
+        next_month = datetime(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+        shards.extend(_split_by_rows(query, count, max_rows, {
+            "label": month_start.strftime('%Y-%m'),
+            "created_from": month_start.isoformat(),
+            "created_to": next_month.isoformat(),
+        }))
+    return shards
+
+
+def plan_shards(
+    filters: Dict[str, Any],
+    scope_user_id: Optional[int],
+    shard_by: str,
+    max_rows: int
+) -> List[Dict[str, Any]]:
+    """plan_export_shards for an export's filters (runs in a render pool worker process)"""
+    db = SessionLocal()
+    try:
+        return plan_export_shards(build_export_query(db, filters, scope_user_id), shard_by, max_rows)
+    finally:
+        db.close()
+
+
+def render_export_shard(
+    filters: Dict[str, Any],
+    scope_user_id: Optional[int],
+    shard: Dict[str, Any],
+    export_format: str,
+    layout: str,
+    path: str
+) -> int:
+    """Render one shard to `path` (runs in a render pool worker process)"""
+    db = SessionLocal()
+    try:
+        query = apply_shard_bounds(build_export_query(db, filters, scope_user_id), shard)
+        return export_writer(export_format, layout)(db, query, filters, path)
+    finally:
+        db.close()
+
+
+def pack_export_shards(work_dir: str, manifest: Dict[str, Any], path: str) -> None:
+    """Zip the rendered shard files and the manifest into `path` (runs in a render pool worker process)"""
+    # Workbooks and Parquet files are already compressed
+    compression = zipfile.ZIP_DEFLATED if manifest["format"] == "csv" else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, "w", compression=compression) as archive:
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        for shard in manifest["files"]:
+            archive.write(os.path.join(work_dir, shard["file"]), shard["file"])
+
+
+async def write_sharded_export(
+    filters: Dict[str, Any],
+    scope_user_id: Optional[int],
+    path: str,
+    shard_by: str,
+    max_rows: int = EXPORT_SHARD_MAX_ROWS,
+    export_format: str = "xlsx",
+    layout: str = "combined"
+) -> int:
+    """
+    Render every shard concurrently and write them to a zip archive at `path`.
+
+    Returns the total number of inspections exported.
+    """
+    shards = await run_in_render_pool(plan_shards, filters, scope_user_id, shard_by, max_rows)
+    extension = EXPORT_FORMATS[export_format]["extension"]
+    work_dir = tempfile.mkdtemp(prefix="inspections_shards_")
+
+    try:
+        for shard in shards:
+            shard["file"] = f"inspections_{shard['label']}{extension}"
+        shard_rows = await asyncio.gather(*[
+            run_in_render_pool(
+                render_export_shard, filters, scope_user_id, shard, export_format, layout,
+                os.path.join(work_dir, shard["file"])
+            )
+            for shard in shards
+        ])
+        for shard, rows in zip(shards, shard_rows):
+            shard["rows"] = rows
+
+        manifest = {
+            "generated_at": datetime.now().isoformat(),
+            "format": export_format,
+            "layout": layout,
+            "filters": filters,
+            "shard_by": shard_by,
+            "max_rows_per_file": max_rows,
+            "total_rows": sum(shard["rows"] for shard in shards),
+            "files": shards,
+        }
+        await run_in_render_pool(pack_export_shards, work_dir, manifest, path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    logger.info(f"Wrote {len(shards)} {export_format} shards ({manifest['total_rows']} inspections) to {path}")
+    return manifest["total_rows"]
@@ -0,0 +1,173 @@
+"""
+Disk-backed file cache with size- and age-based eviction.
+
+Entries are plain files named after a SHA-256 digest of their key, so any
+API worker process sharing the directory can serve them. Reads refresh the
+file's mtime, which makes size-based eviction least-recently-used. An entry
+larger than the whole budget is not stored at all; put_* return None and
+the caller serves its own copy.
+
+Each instance keeps a running estimate of the directory size, so a put
+only scans the directory when the estimate goes over budget or the last
+scan is older than FILE_CACHE_RESCAN_SECONDS (which also picks up entries
+written by other processes and drops expired ones).
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Longest a cache goes without a full directory scan while puts are coming in
+FILE_CACHE_RESCAN_SECONDS = float(os.getenv("FILE_CACHE_RESCAN_SECONDS", "60"))
+
+
+class FileCache:
+    """Directory of cached files bounded by total size and entry age"""
+
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        # Estimated bytes in the directory (None until the first scan) and when it was last scanned
+        self._size: Optional[int] = None
+        self._scanned_at = 0.0
+
+    def path_for(self, key: str, suffix: str = "") -> str:
+        """File path an entry with this key is stored under"""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}{suffix}")
+
+    def _is_expired(self, path: str, now: float) -> bool:
+        return self.max_age_seconds is not None and now - os.path.getmtime(path) > self.max_age_seconds
+
+    def get(self, key: str, suffix: str = "") -> Optional[str]:
+        """Return the path of a live entry, or None on a miss"""
+        path = self.path_for(key, suffix)
+        try:
+            if self._is_expired(path, time.time()):
+                os.remove(path)
+                return None
+            # Refresh mtime so eviction keeps recently used entries
+            os.utime(path, None)
+            return path
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, key: str, src_path: str, suffix: str = "", move: bool = False) -> Optional[str]:
+        """
+        Store a copy of src_path (or move it) under key and return the cached path.
+
+        Returns None, leaving src_path in place, if the file alone exceeds max_bytes.
+        """
+        if os.path.getsize(src_path) > self.max_bytes:
+            logger.info(f"Not caching {src_path}: larger than the {self.max_bytes} byte cache")
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key, suffix)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            if move:
+                shutil.move(src_path, tmp_path)
+            else:
+                shutil.copyfile(src_path, tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._added(path, size)
+        return path
+
+    def put_bytes(self, key: str, data: bytes, suffix: str = "") -> Optional[str]:
+        """Store bytes under key and return the cached path, or None if data alone exceeds max_bytes"""
+        if len(data) > self.max_bytes:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key, suffix)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._added(path, len(data))
+        return path
+
+    def delete(self, key: str, suffix: str = "") -> None:
+        """Remove an entry if present"""
+        try:
+            os.remove(self.path_for(key, suffix))
+        except FileNotFoundError:
+            pass
+
+    def _added(self, path: str, size: int) -> None:
+        """Account for a new entry; scan and evict only when the estimate says it is needed"""
+        with self._lock:
+            if (
+                self._size is not None
+                and self._size + size <= self.max_bytes
+                and time.time() - self._scanned_at < FILE_CACHE_RESCAN_SECONDS
+            ):
+                # Replacing an entry counts it twice; overestimating only brings the next scan forward
+                self._size += size
+                return
+        self.evict(keep=path)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Drop expired entries, then least recently used ones until under max_bytes.
+
+        keep (the entry just written) is never dropped, so its caller can still serve it.
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                return
+
+            kept_size = 0
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                    if path == keep:
+                        kept_size = stat.st_size
+                        continue
+                    if self._is_expired(path, now):
+                        os.remove(path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                except FileNotFoundError:
+                    continue
+
+            total = kept_size + sum(size for _mtime, size, _path in entries)
+            for _mtime, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    logger.debug(f"Evicted cache entry {path}")
+                except FileNotFoundError:
+                    continue
+
+            self._size = total
+            self._scanned_at = now
@@ -2,15 +2,154 @@
 Flag condition evaluator for detecting abnormal data in inspection responses.
 This module contains logic to evaluate if inspection responses meet the flag conditions
 defined by administrators for marking abnormal data.
+
+Flag conditions are compiled once per field into a CompiledFlagRule (value
+sets as frozensets, measurement bounds as floats) and cached by field id,
+so evaluating many responses never re-reads the raw flag_conditions dict.
 """
 
-from typing import Dict, Any, Optional, List
+import copy
+import os
+import threading
+from typing import Dict, Any, Optional, List, Tuple
 from decimal import Decimal
 from schemas import FieldType
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Compiled rules kept per process; the cache is cleared when it grows past this
+FLAG_RULE_CACHE_SIZE = int(os.getenv("FLAG_RULE_CACHE_SIZE", "4096"))
+
+# Field types whose flag conditions list abnormal/normal values
+VALUE_FIELD_TYPES = frozenset({
+    FieldType.button.value, FieldType.dropdown.value, FieldType.search_dropdown.value
+})
+
+
+def _field_type_value(field_type: Any) -> Optional[str]:
+    """Raw string value of a schema/model FieldType enum (or a plain string)"""
+    return getattr(field_type, 'value', field_type)
+
+
+def _parse_bound(flag_conditions: Dict[str, Any], name: str) -> Optional[float]:
+    """Measurement bound from flag conditions as a float, None when unset or invalid"""
+    value = flag_conditions.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid flag condition {name}: {value!r}")
+        return None
+
+
+class CompiledFlagRule:
+    """Flag conditions of one field, pre-parsed for repeated evaluation"""
+
+    __slots__ = ("field_type", "abnormal_values", "normal_values", "min_value", "max_value", "required")
+
+    def __init__(self, field_type: str, flag_conditions: Dict[str, Any]):
+        self.field_type = field_type
+        self.abnormal_values = frozenset(flag_conditions.get('abnormal_values') or ())
+        self.normal_values = frozenset(flag_conditions.get('normal_values') or ())
+        self.min_value = _parse_bound(flag_conditions, 'min_value')
+        self.max_value = _parse_bound(flag_conditions, 'max_value')
+        self.required = bool(flag_conditions.get('required', False))
+
+    def is_flagged(self, response_value: Optional[str], measurement_value: Optional[Decimal]) -> bool:
+        """True if a response to this field should be flagged as abnormal"""
+        if self.field_type in VALUE_FIELD_TYPES:
+            if not response_value:
+                return False
+            # Abnormal values are flagged; with normal values, anything outside them is
+            if response_value in self.abnormal_values:
+                return True
+            return bool(self.normal_values) and response_value not in self.normal_values
+
+        # Measurement
+        if measurement_value is None:
+            return self.required
+        try:
+            value = float(measurement_value)
+        except (TypeError, ValueError):
+            # Log error but don't flag on evaluation errors
+            logger.error(f"Error evaluating flag condition for measurement value {measurement_value!r}")
+            return False
+        if self.min_value is not None and value < self.min_value:
+            return True
+        return self.max_value is not None and value > self.max_value
+
+
+def compile_flag_rule(field_type: Any, flag_conditions: Optional[Dict[str, Any]]) -> Optional[CompiledFlagRule]:
+    """
+    Compile flag conditions for a field type.
+
+    Returns None when flagging is disabled or the field type is never
+    flagged, so callers can skip evaluation entirely.
+    """
+    if not flag_conditions or not flag_conditions.get('enabled', False):
+        return None
+    field_type = _field_type_value(field_type)
+    if field_type not in VALUE_FIELD_TYPES and field_type != FieldType.measurement.value:
+        return None
+    try:
+        return CompiledFlagRule(field_type, flag_conditions)
+    except Exception as e:
+        # Malformed conditions (e.g. unhashable values) never flag, as before
+        logger.error(f"Error compiling flag condition for field type {field_type}: {e}")
+        return None
+
+
+class FlagRuleCache:
+    """
+    Compiled flag rules keyed by field id.
+
+    Each entry keeps the field type and a copy of the flag conditions it was
+    compiled from; that pair is the rule's version, so an edited field is
+    recompiled on its next lookup.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._rules: Dict[int, Tuple[Optional[str], Any, Optional[CompiledFlagRule]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, field_id: int, field_type: Any, flag_conditions: Optional[Dict[str, Any]]) -> Optional[CompiledFlagRule]:
+        field_type = _field_type_value(field_type)
+        entry = self._rules.get(field_id)
+        if entry is not None and entry[0] == field_type and entry[1] == flag_conditions:
+            return entry[2]
+
+        rule = compile_flag_rule(field_type, flag_conditions)
+        with self._lock:
+            if len(self._rules) >= self.max_entries:
+                self._rules.clear()
+            self._rules[field_id] = (field_type, copy.deepcopy(flag_conditions), rule)
+        return rule
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rules.clear()
+
+
+flag_rule_cache = FlagRuleCache(FLAG_RULE_CACHE_SIZE)
+
+
+def field_flag_rule(field: Any) -> Optional[CompiledFlagRule]:
+    """Cached compiled flag rule of a FormField"""
+    return flag_rule_cache.get(field.id, field.field_type, field.flag_conditions)
+
+
+def is_response_flagged(
+    field: Any,
+    response_value: Optional[str],
+    measurement_value: Optional[Decimal]
+) -> bool:
+    """Evaluate a response to a FormField against its cached compiled flag rule"""
+    rule = field_flag_rule(field)
+    return rule is not None and rule.is_flagged(response_value, measurement_value)
+
 
 class FlagEvaluator:
     """Evaluates flag conditions for inspection responses"""
@@ -25,6 +164,9 @@ class FlagEvaluator:
         """
         Evaluate if a field response should be flagged as abnormal.
         
+        Compiles the conditions on every call; code that knows the field should
+        use is_response_flagged, which reuses the cached rule.
+        
         Args:
             field_type: Type of the field (button, dropdown, measurement, etc.)
             response_value: The response value (for buttons, dropdowns, etc.)
@@ -33,96 +175,13 @@ class FlagEvaluator:
             
         Returns:
             bool: True if the response should be flagged as abnormal, False otherwise
-        """
-        if not flag_conditions or not flag_conditions.get('enabled', False):
-            return False
-            
-        try:
-            if field_type == FieldType.BUTTON:
-                return FlagEvaluator._evaluate_button_field(response_value, flag_conditions)
-            elif field_type == FieldType.DROPDOWN:
-                return FlagEvaluator._evaluate_dropdown_field(response_value, flag_conditions)
-            elif field_type == FieldType.SEARCH_DROPDOWN:
-                return FlagEvaluator._evaluate_search_dropdown_field(response_value, flag_conditions)
-            elif field_type == FieldType.MEASUREMENT:
-                return FlagEvaluator._evaluate_measurement_field(measurement_value, flag_conditions)
-            else:
-                # For other field types, no flag evaluation by default
-                return False
-                
-        except Exception as e:
-            # Log error but don't flag on evaluation errors
-            logger.error(f"Error evaluating flag condition for field type {field_type}: {e}")
-            return False
-    
-    @staticmethod
-    def _evaluate_button_field(response_value: Optional[str], flag_conditions: Dict[str, Any]) -> bool:
-        """
-        Evaluate button field flag conditions.
-        
-        Flag conditions format for buttons:
-        {
-            "enabled": true,
-            "abnormal_values": ["button_2", "button_3"],  # Values considered abnormal
-            "normal_values": ["button_1"]  # Values considered normal (optional)
-        }
-        """
-        if not response_value:
-            return False
-            
-        abnormal_values = flag_conditions.get('abnormal_values', [])
-        normal_values = flag_conditions.get('normal_values', [])
-        
-        # If abnormal values are specified, check if response is in abnormal list
-        if abnormal_values and response_value in abnormal_values:
-            return True
-            
-        # If normal values are specified, flag anything not in normal list
-        if normal_values and response_value not in normal_values:
-            return True
-            
-        return False
-    
-    @staticmethod
-    def _evaluate_dropdown_field(response_value: Optional[str], flag_conditions: Dict[str, Any]) -> bool:
-        """
-        Evaluate dropdown field flag conditions.
         
-        Flag conditions format for dropdowns:
+        Flag conditions format for buttons and (search) dropdowns:
         {
             "enabled": true,
             "abnormal_values": ["option_2", "option_3"],  # Values considered abnormal
             "normal_values": ["option_1"]  # Values considered normal (optional)
         }
-        """
-        if not response_value:
-            return False
-            
-        abnormal_values = flag_conditions.get('abnormal_values', [])
-        normal_values = flag_conditions.get('normal_values', [])
-        
-        # If abnormal values are specified, check if response is in abnormal list
-        if abnormal_values and response_value in abnormal_values:
-            return True
-            
-        # If normal values are specified, flag anything not in normal list
-        if normal_values and response_value not in normal_values:
-            return True
-            
-        return False
-    
-    @staticmethod
-    def _evaluate_search_dropdown_field(response_value: Optional[str], flag_conditions: Dict[str, Any]) -> bool:
-        """
-        Evaluate search dropdown field flag conditions.
-        Same logic as regular dropdown.
-        """
-        return FlagEvaluator._evaluate_dropdown_field(response_value, flag_conditions)
-    
-    @staticmethod
-    def _evaluate_measurement_field(measurement_value: Optional[Decimal], flag_conditions: Dict[str, Any]) -> bool:
-        """
-        Evaluate measurement field flag conditions.
         
         Flag conditions format for measurements:
         {
@@ -132,26 +191,8 @@ class FlagEvaluator:
             "required": true  # Whether value is required
         }
         """
-        required = flag_conditions.get('required', False)
-        min_value = flag_conditions.get('min_value')
-        max_value = flag_conditions.get('max_value')
-        
-        # Check if value is required but missing
-        if required and measurement_value is None:
-            return True
-            
-        # If no value provided and not required, don't flag
-        if measurement_value is None:
-            return False
-            
-        # Check min/max bounds
-        if min_value is not None and float(measurement_value) < min_value:
-            return True
-            
-        if max_value is not None and float(measurement_value) > max_value:
-            return True
-            
-        return False
+        rule = compile_flag_rule(field_type, flag_conditions)
+        return rule is not None and rule.is_flagged(response_value, measurement_value)
     
     @staticmethod
     def evaluate_inspection_responses(responses: List[Dict[str, Any]], form_fields: List[Dict[str, Any]]) -> List[bool]:
@@ -165,30 +206,18 @@ class FlagEvaluator:
         Returns:
             List[bool]: List of flag statuses for each response
         """
-        # Create a mapping of field_id to flag_conditions
-        field_flag_conditions = {}
-        field_types = {}
-        
-        for field in form_fields:
-            field_flag_conditions[field['id']] = field.get('flag_conditions')
-            field_types[field['id']] = field['field_type']
+        # Compile each field's flag conditions once
+        field_rules = {
+            field['id']: flag_rule_cache.get(field['id'], field['field_type'], field.get('flag_conditions'))
+            for field in form_fields
+        }
         
         flag_results = []
         
         for response in responses:
-            field_id = response.get('field_id')
-            if field_id not in field_flag_conditions:
-                flag_results.append(False)
-                continue
-                
-            field_type = field_types.get(field_id)
-            flag_conditions = field_flag_conditions.get(field_id)
-            
-            is_flagged = FlagEvaluator.evaluate_field_response(
-                field_type=field_type,
-                response_value=response.get('response_value'),
-                measurement_value=response.get('measurement_value'),
-                flag_conditions=flag_conditions
+            rule = field_rules.get(response.get('field_id'))
+            is_flagged = rule is not None and rule.is_flagged(
+                response.get('response_value'), response.get('measurement_value')
             )
             
             flag_results.append(is_flagged)
@@ -222,4 +251,4 @@ def evaluate_flag_conditions(
         response_value=response_value,
         measurement_value=measurement_value,
         flag_conditions=flag_conditions
-    )
\ No newline at end of file
+    )
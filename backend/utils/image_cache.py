@@ -0,0 +1,87 @@
+"""
+Cache of photos and signatures already processed for PDF export.
+
+Entries are keyed by a SHA-256 of the stored base64 image plus the target
+box and image type, and hold the resized JPEG/PNG bytes with the display
+size ReportLab needs. A small in-memory LRU sits in front of a disk cache
+shared by every worker process, so repeat renders skip PIL entirely.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .file_cache import FileCache
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join("cache", "images"))
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "256"))
+IMAGE_CACHE_MEMORY_MB = int(os.getenv("IMAGE_CACHE_MEMORY_MB", "32"))
+
+# (image bytes, display width, display height)
+ProcessedImage = Tuple[bytes, float, float]
+
+
+def image_cache_key(base64_data: str, max_width: float, max_height: float, image_type: str) -> str:
+    """Cache key for one image rendered into a max_width x max_height box"""
+    digest = hashlib.sha256(base64_data.strip().encode("utf-8")).hexdigest()
+    return f"{digest}:{max_width:.2f}x{max_height:.2f}:{image_type}"
+
+
+class ProcessedImageCache:
+    """In-memory LRU (bounded by bytes) in front of a disk FileCache"""
+
+    def __init__(self, directory: str, disk_max_bytes: int, memory_max_bytes: int):
+        self.disk = FileCache(directory, max_bytes=disk_max_bytes)
+        self.memory_max_bytes = memory_max_bytes
+        self._memory: "OrderedDict[str, ProcessedImage]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, entry: ProcessedImage) -> None:
+        size = len(entry[0])
+        if size > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous:
+                self._memory_bytes -= len(previous[0])
+            self._memory[key] = entry
+            self._memory_bytes += size
+            while self._memory_bytes > self.memory_max_bytes:
+                _old_key, old_entry = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old_entry[0])
+
+    def get(self, key: str) -> Optional[ProcessedImage]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                self._memory.move_to_end(key)
+                return entry
+
+        path = self.disk.get(key, ".img")
+        if not path:
+            return None
+        try:
+            with open(path, "rb") as f:
+                # First line holds the display size, the rest is the image
+                header, data = f.read().split(b"\n", 1)
+            width, height = (float(value) for value in header.split(b","))
+        except (OSError, ValueError):
+            return None
+
+        entry = (data, width, height)
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, data: bytes, width: float, height: float) -> None:
+        self._remember(key, (data, width, height))
+        self.disk.put_bytes(key, f"{width!r},{height!r}\n".encode("ascii") + data, ".img")
+
+
+image_cache = ProcessedImageCache(
+    IMAGE_CACHE_DIR,
+    disk_max_bytes=IMAGE_CACHE_MAX_MB * 1024 * 1024,
+    memory_max_bytes=IMAGE_CACHE_MEMORY_MB * 1024 * 1024
+)
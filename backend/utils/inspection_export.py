@@ -0,0 +1,1127 @@
+"""
+Inspection export helpers.
+
+Shared by the export endpoints: filter validation, the filtered
+inspection query, per-row formatting for the "Detailed Data" sheet and
+streaming writers (write-only Excel, CSV, Parquet) that pull inspections
+in chunks so memory stays flat regardless of row count.
+"""
+
+import csv
+import os
+import re
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import (
+    User,
+    Inspection,
+    InspectionResponse,
+    Form,
+    FormField,
+    InspectionStatus as ModelInspectionStatus,
+)
+from .logging_config import get_logger
+from .pagination import decode_cursor, encode_cursor
+
+logger = get_logger(__name__)
+
+EXCEL_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Response header carrying the watermark for the next incremental export
+NEXT_WATERMARK_HEADER = "X-Next-Watermark"
+
+# Number of inspections pulled from the database per chunk in streaming mode
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+
+# Incremental watermarks never pass (database time - this lag), so rows that
+# commit late, or change again within the same second, are re-read by the
+# next pull instead of skipped
+EXPORT_WATERMARK_LAG_SECONDS = int(os.getenv("EXPORT_WATERMARK_LAG_SECONDS", "120"))
+
+# Maximum column width (in characters) applied when sizing columns
+MAX_COLUMN_WIDTH = 50
+
+# Excel limits worksheet titles to 31 characters and forbids these characters
+MAX_SHEET_TITLE_LENGTH = 31
+INVALID_SHEET_TITLE_CHARS = re.compile(r"[\\/*?:\[\]]")
+
+BASE_DETAIL_HEADERS = [
+    "Inspection ID",
+    "Form Name",
+    "Inspector",
+    "Status",
+    "Created Date",
+    "Updated Date",
+    "Reviewed By",
+    "Reviewed Date",
+    "Rejection Reason"
+]
+
+# Shared export styles
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=12, name="Calibri")
+HEADER_FILL = PatternFill(start_color="1E40AF", end_color="3B82F6", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+SUBHEADER_FONT = Font(bold=True, color="1E40AF", size=11, name="Calibri")
+SUBHEADER_FILL = PatternFill(start_color="E0E7FF", end_color="E0E7FF", fill_type="solid")
+SUBHEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+SECTION_FONT = Font(name='Calibri', size=12, bold=True, color='1E40AF')
+TITLE_FONT = Font(name='Calibri', size=16, bold=True, color='1E40AF')
+CELL_ALIGNMENT = Alignment(horizontal="left", vertical="top", wrap_text=True)
+CELL_FONT = Font(name="Calibri", size=10)
+PASS_FILL = PatternFill(start_color="D1FAE5", end_color="D1FAE5", fill_type="solid")
+HOLD_FILL = PatternFill(start_color="FEE2E2", end_color="FEE2E2", fill_type="solid")
+PENDING_FILL = PatternFill(start_color="FEF3C7", end_color="FEF3C7", fill_type="solid")
+THIN_BORDER = Border(
+    left=Side(style='thin', color="D1D5DB"),
+    right=Side(style='thin', color="D1D5DB"),
+    top=Side(style='thin', color="D1D5DB"),
+    bottom=Side(style='thin', color="D1D5DB")
+)
+
+# Named styles registered on per-form workbooks
+HEADER_STYLE_NAME = "Export Header"
+CELL_STYLE_NAME = "Export Cell"
+
+
+def parse_export_filters(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    form_id: Optional[int] = None,
+    status_filter: Optional[str] = None,
+    since: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Validate export filter parameters.
+
+    Returns a plain dict of the validated filters so it can be reused by
+    build_export_query and passed around (e.g. to background workers).
+    since is a watermark from a previous export's X-Next-Watermark header.
+    """
+    since_key = None
+    if since:
+        try:
+            since_updated_at, since_id = decode_cursor(since)
+        except HTTPException:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid since watermark"
+            )
+        since_key = {"updated_at": since_updated_at.isoformat(), "id": since_id}
+
+    if start_date:
+        try:
+            datetime.strptime(start_date, '%Y-%m-%d')
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid start_date format. Use YYYY-MM-DD"
+            )
+
+    if end_date:
+        try:
+            datetime.strptime(end_date, '%Y-%m-%d')
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid end_date format. Use YYYY-MM-DD"
+            )
+
+    if status_filter:
+        try:
+            ModelInspectionStatus(status_filter)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status_filter. Must be one of: {', '.join([s.value for s in ModelInspectionStatus])}"
+            )
+
+    return {
+        "start_date": start_date or None,
+        "end_date": end_date or None,
+        "form_id": form_id or None,
+        "status_filter": status_filter or None,
+        "since": since_key,
+    }
+
+
+def build_export_query(db: Session, filters: Dict[str, Any], scope_user_id: Optional[int] = None):
+    """
+    Build the filtered Inspection query for an export.
+
+    scope_user_id restricts the export to one inspector (used for the "user" role).
+    """
+    query = db.query(Inspection)
+
+    if scope_user_id is not None:
+        query = query.filter(Inspection.inspector_id == scope_user_id)
+
+    if filters.get("start_date"):
+        start_dt = datetime.strptime(filters["start_date"], '%Y-%m-%d')
+        query = query.filter(Inspection.created_at >= start_dt)
+
+    if filters.get("end_date"):
+        # Add one day to include the entire end date
+        end_dt = datetime.strptime(filters["end_date"], '%Y-%m-%d') + timedelta(days=1)
+        query = query.filter(Inspection.created_at < end_dt)
+
+    if filters.get("form_id"):
+        query = query.filter(Inspection.form_id == filters["form_id"])
+
+    if filters.get("status_filter"):
+        query = query.filter(Inspection.status == ModelInspectionStatus(filters["status_filter"]))
+
+    if filters.get("since"):
+        # Only rows changed after the watermark, seeking on (updated_at, id)
+        since_updated_at = datetime.fromisoformat(filters["since"]["updated_at"])
+        query = query.filter(
+            or_(
+                Inspection.updated_at > since_updated_at,
+                and_(Inspection.updated_at == since_updated_at, Inspection.id > filters["since"]["id"])
+            )
+        )
+
+    return query
+
+
+def next_export_watermark(query, filters: Dict[str, Any]) -> Optional[str]:
+    """
+    Watermark to pass as `since` on the next incremental export.
+
+    This is the (updated_at, id) key of the most recently changed row the
+    query matches, capped at the database clock minus
+    EXPORT_WATERMARK_LAG_SECONDS. updated_at has one-second resolution and
+    is taken when a transaction writes, not when it commits; the cap keeps
+    the watermark behind any second that can still gain rows, and rows
+    inside the lag window are exported again by the next pull. When
+    nothing matches, the incoming watermark is returned unchanged (None for
+    a full export of an empty set).
+    """
+    latest = query.order_by(None).with_entities(Inspection.updated_at, Inspection.id).order_by(
+        Inspection.updated_at.desc(), Inspection.id.desc()
+    ).first()
+    if latest:
+        latest_at, latest_id = latest
+        cutoff = query.session.query(func.now()).scalar() - timedelta(seconds=EXPORT_WATERMARK_LAG_SECONDS)
+        if latest_at >= cutoff:
+            # Every row from the cutoff second on is included again next time
+            return encode_cursor(cutoff.replace(microsecond=0), 0)
+        return encode_cursor(latest_at, latest_id)
+    if filters.get("since"):
+        return encode_cursor(datetime.fromisoformat(filters["since"]["updated_at"]), filters["since"]["id"])
+    return None
+
+
+def iter_inspection_chunks(query, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[Inspection]]:
+    """
+    Yield the query's inspections in id order, chunk_size rows at a time.
+
+    Rows are read through a single server-side cursor (yield_per enables
+    stream_results; on MySQL pymysql then uses an unbuffered SSCursor), so
+    only about one chunk is buffered at a time. The cursor runs on its own
+    session: MySQL cannot run other statements on a connection while an
+    unbuffered result is open, and callers look up responses per chunk on
+    the original session.
+    """
+    stream_db = Session(bind=query.session.get_bind())
+    try:
+        chunk: List[Inspection] = []
+        for inspection in query.with_session(stream_db).order_by(Inspection.id).yield_per(chunk_size):
+            chunk.append(inspection)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        stream_db.close()
+
+
+def field_type_value(field: FormField) -> str:
+    """Return the field type of a FormField as its raw string value"""
+    return getattr(field.field_type, 'value', field.field_type)
+
+
+def detail_headers(fields: List[FormField]) -> List[str]:
+    """Header row for the "Detailed Data" sheet"""
+    return BASE_DETAIL_HEADERS + [f"{field.field_name} ({field_type_value(field)})" for field in fields]
+
+
+def columnar_headers(fields: List[FormField]) -> List[str]:
+    """
+    Detail headers with unique names, for CSV and Parquet.
+
+    Forms often share field names, which a spreadsheet tolerates but a
+    warehouse loader does not, so repeated labels get the field id appended.
+    """
+    labels = detail_headers(fields)[len(BASE_DETAIL_HEADERS):]
+    label_counts: Dict[str, int] = {}
+    for label in labels:
+        label_counts[label] = label_counts.get(label, 0) + 1
+    return BASE_DETAIL_HEADERS + [
+        f"{label} [field {field.id}]" if label_counts[label] > 1 else label
+        for field, label in zip(fields, labels)
+    ]
+
+
+def format_response_cell(field: FormField, field_response: Optional[InspectionResponse]) -> str:
+    """Format one field response the way the "Detailed Data" sheet shows it"""
+    if not field_response:
+        return "—"
+
+    cell_value = ""
+    field_type = field_type_value(field)
+
+    if field_response.response_value:
+        if field_type == 'signature':
+            cell_value = "[Digital Signature]"
+        elif field_type == 'photo':
+            # Inline base64 photos are too large for a cell, show a marker instead
+            if str(field_response.response_value).startswith('data:image'):
+                cell_value = "[Photo]"
+            else:
+                cell_value = f"[Photo: {field_response.response_value}]"
+        else:
+            cell_value = str(field_response.response_value)
+
+    if field_response.measurement_value is not None:
+        cell_value = str(field_response.measurement_value)
+        if field.field_options and 'unit' in field.field_options:
+            cell_value += f" {field.field_options['unit']}"
+
+    if field_response.pass_hold_status:
+        # Handle both enum and string types for pass_hold_status
+        if hasattr(field_response.pass_hold_status, 'value'):
+            status_text = field_response.pass_hold_status.value.upper()
+        else:
+            status_text = str(field_response.pass_hold_status).upper()
+        cell_value += f" [{status_text}]" if cell_value else f"[{status_text}]"
+
+    return cell_value
+
+
+def format_detail_row(
+    inspection: Inspection,
+    form_name: Optional[str],
+    inspector_name: Optional[str],
+    reviewer_name: Optional[str],
+    responses_map: Dict[int, InspectionResponse],
+    fields: List[FormField]
+) -> List[Any]:
+    """Build one "Detailed Data" row for an inspection"""
+    row_data = [
+        inspection.id,
+        form_name or "N/A",
+        inspector_name or "N/A",
+        inspection.status.value.upper(),
+        inspection.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        inspection.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
+        reviewer_name or "",
+        inspection.reviewed_at.strftime('%Y-%m-%d %H:%M:%S') if inspection.reviewed_at else "",
+        inspection.rejection_reason or ""
+    ]
+
+    for field in fields:
+        row_data.append(format_response_cell(field, responses_map.get(field.id)))
+
+    return row_data
+
+
+def load_export_fields(db: Session, query):
+    """Form names and the union of fields for the forms the query matches"""
+    form_ids = query.order_by(None).with_entities(Inspection.form_id).distinct().subquery()
+    form_names = dict(
+        db.query(Form.id, Form.form_name).filter(Form.id.in_(select(form_ids.c.form_id))).all()
+    )
+    fields = db.query(FormField).filter(
+        FormField.form_id.in_(list(form_names))
+    ).order_by(FormField.form_id, FormField.field_order).all() if form_names else []
+    return form_names, fields
+
+
+class ColumnWidthTracker:
+    """
+    Longest value per column, observed while rows are emitted.
+
+    Replaces a second pass over the finished sheet: writers feed every value
+    they write through observe(), then apply() sets the column widths.
+    """
+
+    def __init__(self):
+        self.widths: Dict[int, int] = {}
+
+    def observe(self, col_num: int, value: Any) -> None:
+        # Columns already at the cap cannot grow, skip the str() call
+        current = self.widths.get(col_num, 0)
+        if current >= MAX_COLUMN_WIDTH or value is None or value == "":
+            return
+        length = len(str(value))
+        if length > current:
+            self.widths[col_num] = length
+
+    def observe_row(self, row: List[Any], start_col: int = 1) -> None:
+        for col_num, value in enumerate(row, start_col):
+            # Write-only cells carry their value on .value
+            self.observe(col_num, getattr(value, 'value', value))
+
+    def apply(self, ws) -> None:
+        for col_num, width in self.widths.items():
+            ws.column_dimensions[get_column_letter(col_num)].width = min(width + 2, MAX_COLUMN_WIDTH)
+
+
+def build_workbook(db: Session, query, filters: Dict[str, Any], chunk_size: int = EXPORT_CHUNK_SIZE) -> Workbook:
+    """
+    Build the styled three-sheet export workbook in memory.
+
+    Inspections are read through iter_detail_chunks, so apart from the
+    workbook itself only one chunk of rows is held at a time. The detail
+    sheet is written first and collects the summary statistics on the way.
+    """
+    form_names, all_fields = load_export_fields(db, query)
+    fields_by_form: Dict[int, List[FormField]] = {form_id: [] for form_id in form_names}
+    for field in all_fields:
+        fields_by_form[field.form_id].append(field)
+
+    # Create Enhanced Excel workbook with multiple sheets
+    wb = Workbook()
+
+    # Remove default sheet and create custom sheets
+    wb.remove(wb.active)
+    summary_ws = wb.create_sheet("📊 Summary")
+    detail_ws = wb.create_sheet("📋 Detailed Data")
+    forms_ws = wb.create_sheet("📝 Forms Overview")
+
+    # === DETAILED DATA SHEET ===
+    headers = detail_headers(all_fields)
+    detail_widths = ColumnWidthTracker()
+    detail_widths.observe_row(headers)
+
+    # Write headers
+    for col_num, header in enumerate(headers, 1):
+        cell = detail_ws.cell(row=1, column=col_num, value=header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        cell.border = THIN_BORDER
+
+    # Statistics for the summary and forms overview sheets
+    status_counts: Dict[str, int] = {}
+    form_counts: Dict[str, int] = {}
+    form_inspection_counts: Dict[int, int] = {}
+    form_last_used: Dict[int, datetime] = {}
+
+    # Write data rows
+    row_num = 2
+    for chunk, rows in iter_detail_chunks(db, query, form_names, all_fields, chunk_size):
+        for inspection, row_data in zip(chunk, rows):
+            status_name = inspection.status.value
+            status_counts[status_name] = status_counts.get(status_name, 0) + 1
+
+            form_name = form_names.get(inspection.form_id) or "Unknown Form"
+            form_counts[form_name] = form_counts.get(form_name, 0) + 1
+
+            form_inspection_counts[inspection.form_id] = form_inspection_counts.get(inspection.form_id, 0) + 1
+            last_used = form_last_used.get(inspection.form_id)
+            if last_used is None or inspection.created_at > last_used:
+                form_last_used[inspection.form_id] = inspection.created_at
+
+            for col_num, value in enumerate(row_data, 1):
+                cell = detail_ws.cell(row=row_num, column=col_num, value=value)
+                cell.alignment = CELL_ALIGNMENT
+                cell.border = THIN_BORDER
+                cell.font = CELL_FONT
+                detail_widths.observe(col_num, value)
+
+            row_num += 1
+
+    detail_widths.apply(detail_ws)
+    total_inspections = row_num - 2
+
+    # === POPULATE SUMMARY SHEET ===
+    summary_widths = ColumnWidthTracker()
+    summary_ws['A1'] = "INSPECTION EXPORT SUMMARY"
+    summary_ws['A1'].font = TITLE_FONT
+    summary_ws.merge_cells('A1:D1')
+    summary_ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+
+    # Export details section
+    summary_ws['A3'] = "Export Details"
+    summary_ws['A3'].font = SECTION_FONT
+    summary_ws['A3'].fill = SUBHEADER_FILL
+
+    form_name_display = "All Forms"
+    if filters.get("form_id"):
+        form_name_display = form_names.get(filters["form_id"]) or form_name_display
+
+    summary_ws['A4'] = f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    summary_ws['A5'] = f"Total Inspections: {total_inspections}"
+    summary_ws['A6'] = f"Date Range: {filters.get('start_date') or 'All'} to {filters.get('end_date') or 'All'}"
+    summary_ws['A7'] = f"Form Filter: {form_name_display}"
+    summary_ws['A8'] = f"Status Filter: {filters.get('status_filter') or 'All Statuses'}"
+    for line in range(1, 9):
+        summary_widths.observe(1, summary_ws[f'A{line}'].value)
+
+    summary_ws['A10'] = "Status Distribution"
+    summary_ws['A10'].font = SECTION_FONT
+    summary_ws['A10'].fill = SUBHEADER_FILL
+    summary_widths.observe(1, summary_ws['A10'].value)
+
+    # Status distribution headers
+    summary_ws['A11'] = "Status"
+    summary_ws['B11'] = "Count"
+    summary_ws['C11'] = "Percentage"
+    summary_widths.observe_row(["Status", "Count", "Percentage"])
+    for cell in ['A11', 'B11', 'C11']:
+        summary_ws[cell].font = SUBHEADER_FONT
+        summary_ws[cell].fill = SUBHEADER_FILL
+        summary_ws[cell].alignment = SUBHEADER_ALIGNMENT
+        summary_ws[cell].border = THIN_BORDER
+
+    # Status data rows
+    row = 12
+    for status_name, count in status_counts.items():
+        percentage = f"{(count/total_inspections*100):.1f}%" if total_inspections > 0 else "0%"
+
+        summary_ws[f'A{row}'] = status_name.upper()
+        summary_ws[f'B{row}'] = count
+        summary_ws[f'C{row}'] = percentage
+        summary_widths.observe_row([status_name.upper(), count, percentage])
+
+        # Apply status-specific styling
+        if status_name == 'accepted':
+            fill = PASS_FILL
+        elif status_name == 'rejected':
+            fill = HOLD_FILL
+        else:
+            fill = PENDING_FILL
+
+        for col in ['A', 'B', 'C']:
+            cell = summary_ws[f'{col}{row}']
+            cell.fill = fill
+            cell.font = CELL_FONT
+            cell.alignment = CELL_ALIGNMENT
+            cell.border = THIN_BORDER
+
+        row += 1
+
+    # Form distribution section
+    summary_ws[f'A{row + 1}'] = "📝 Form Distribution"
+    summary_ws[f'A{row + 1}'].font = SECTION_FONT
+    summary_ws[f'A{row + 1}'].fill = SUBHEADER_FILL
+    summary_widths.observe(1, "📝 Form Distribution")
+
+    # Form distribution headers
+    row += 2
+    summary_ws[f'A{row}'] = "Form Name"
+    summary_ws[f'B{row}'] = "Count"
+    summary_ws[f'C{row}'] = "Percentage"
+    summary_widths.observe_row(["Form Name", "Count", "Percentage"])
+    for cell in [f'A{row}', f'B{row}', f'C{row}']:
+        summary_ws[cell].font = SUBHEADER_FONT
+        summary_ws[cell].fill = SUBHEADER_FILL
+        summary_ws[cell].alignment = SUBHEADER_ALIGNMENT
+        summary_ws[cell].border = THIN_BORDER
+
+    # Form data rows
+    row += 1
+    for form_name, count in form_counts.items():
+        percentage = f"{(count/total_inspections*100):.1f}%" if total_inspections > 0 else "0%"
+
+        summary_ws[f'A{row}'] = form_name
+        summary_ws[f'B{row}'] = count
+        summary_ws[f'C{row}'] = percentage
+        summary_widths.observe_row([form_name, count, percentage])
+
+        for col in ['A', 'B', 'C']:
+            cell = summary_ws[f'{col}{row}']
+            cell.font = CELL_FONT
+            cell.alignment = CELL_ALIGNMENT
+            cell.border = THIN_BORDER
+
+        row += 1
+
+    summary_widths.apply(summary_ws)
+
+    # === POPULATE FORMS OVERVIEW SHEET ===
+    forms_widths = ColumnWidthTracker()
+    forms_ws['A1'] = "📝 FORMS OVERVIEW"
+    forms_ws['A1'].font = TITLE_FONT
+    forms_ws.merge_cells('A1:E1')
+    forms_ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+
+    # Forms overview headers
+    forms_ws['A3'] = "Form Name"
+    forms_ws['B3'] = "Total Fields"
+    forms_ws['C3'] = "Field Types"
+    forms_ws['D3'] = "Inspections Count"
+    forms_ws['E3'] = "Last Used"
+    forms_widths.observe(1, "📝 FORMS OVERVIEW")
+    forms_widths.observe_row(["Form Name", "Total Fields", "Field Types", "Inspections Count", "Last Used"])
+    for cell in ['A3', 'B3', 'C3', 'D3', 'E3']:
+        forms_ws[cell].font = SUBHEADER_FONT
+        forms_ws[cell].fill = SUBHEADER_FILL
+        forms_ws[cell].alignment = SUBHEADER_ALIGNMENT
+        forms_ws[cell].border = THIN_BORDER
+
+    # Forms data rows
+    row = 4
+    for form_id, form_name in sorted(form_names.items()):
+        form_fields = fields_by_form.get(form_id, [])
+        field_types = sorted(set(field_type_value(field) for field in form_fields))
+        last_used = form_last_used.get(form_id)
+
+        form_row = [
+            form_name,
+            len(form_fields),
+            ", ".join(field_types),
+            form_inspection_counts.get(form_id, 0),
+            last_used.strftime('%Y-%m-%d') if last_used else "Never"
+        ]
+        for col_num, value in enumerate(form_row, 1):
+            forms_ws.cell(row=row, column=col_num, value=value)
+        forms_widths.observe_row(form_row)
+
+        for col in ['A', 'B', 'C', 'D', 'E']:
+            cell = forms_ws[f'{col}{row}']
+            cell.font = CELL_FONT
+            cell.alignment = CELL_ALIGNMENT
+            cell.border = THIN_BORDER
+
+        row += 1
+
+    forms_widths.apply(forms_ws)
+
+    return wb
+
+
+def iter_detail_chunks(
+    db: Session,
+    query,
+    form_names: Dict[int, str],
+    fields: List[FormField],
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[Tuple[List[Inspection], List[List[Any]]]]:
+    """
+    Yield (inspections, "Detailed Data" rows) for the query, one chunk at a time.
+
+    Each chunk costs one query for its responses and one for any users not
+    seen in earlier chunks.
+    """
+    user_names: Dict[int, str] = {}
+    for chunk in iter_inspection_chunks(query, chunk_size):
+        chunk_ids = [inspection.id for inspection in chunk]
+
+        responses_by_inspection: Dict[int, Dict[int, InspectionResponse]] = {}
+        for response in db.query(InspectionResponse).filter(
+            InspectionResponse.inspection_id.in_(chunk_ids)
+        ).all():
+            responses_by_inspection.setdefault(response.inspection_id, {})[response.field_id] = response
+
+        user_ids = {inspection.inspector_id for inspection in chunk}
+        user_ids.update(inspection.reviewed_by for inspection in chunk if inspection.reviewed_by)
+        missing_user_ids = user_ids - user_names.keys()
+        if missing_user_ids:
+            user_names.update(db.query(User.id, User.username).filter(User.id.in_(missing_user_ids)).all())
+
+        yield chunk, [
+            format_detail_row(
+                inspection,
+                form_names.get(inspection.form_id),
+                user_names.get(inspection.inspector_id),
+                user_names.get(inspection.reviewed_by) if inspection.reviewed_by else None,
+                responses_by_inspection.get(inspection.id, {}),
+                fields
+            )
+            for inspection in chunk
+        ]
+
+
+def iter_detail_rows(
+    db: Session,
+    query,
+    form_names: Dict[int, str],
+    fields: List[FormField],
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[List[List[Any]]]:
+    """Yield "Detailed Data" rows for the query, one list of rows per chunk"""
+    for _chunk, rows in iter_detail_chunks(db, query, form_names, fields, chunk_size):
+        yield rows
+
+
+def _styled_cell(ws, value, font=None, fill=None, alignment=None, border=None):
+    """Create a styled cell for a write-only worksheet"""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if alignment is not None:
+        cell.alignment = alignment
+    if border is not None:
+        cell.border = border
+    return cell
+
+
+def _named_cell(ws, value, style_name: str):
+    """Create a write-only cell that uses a registered named style"""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style_name
+    return cell
+
+
+def _register_named_styles(wb: Workbook) -> None:
+    """Add the shared header and data cell styles to a workbook"""
+    wb.add_named_style(NamedStyle(
+        name=HEADER_STYLE_NAME, font=HEADER_FONT, fill=HEADER_FILL,
+        alignment=HEADER_ALIGNMENT, border=THIN_BORDER
+    ))
+    wb.add_named_style(NamedStyle(
+        name=CELL_STYLE_NAME, font=CELL_FONT, alignment=CELL_ALIGNMENT, border=THIN_BORDER
+    ))
+
+
+def sheet_title(name: str, used_titles: set) -> str:
+    """Turn a form name into a unique, valid worksheet title"""
+    base = INVALID_SHEET_TITLE_CHARS.sub(" ", name or "").strip().strip("'") or "Form"
+    title = base[:MAX_SHEET_TITLE_LENGTH]
+    suffix_num = 2
+    while title.lower() in used_titles:
+        suffix = f" ({suffix_num})"
+        title = base[:MAX_SHEET_TITLE_LENGTH - len(suffix)] + suffix
+        suffix_num += 1
+    used_titles.add(title.lower())
+    return title
+
+
+def _write_overview_sheets(db: Session, summary_ws, forms_ws, query, filters: Dict[str, Any]):
+    """
+    Fill the write-only summary and forms overview sheets from aggregate queries.
+
+    Returns (total_inspections, form_stats, fields_by_form) for the detail sheets.
+    """
+    base_query = query.order_by(None)
+    total_inspections = base_query.count()
+    status_counts = base_query.with_entities(
+        Inspection.status, func.count(Inspection.id)
+    ).group_by(Inspection.status).all()
+    form_stats = base_query.join(Form, Inspection.form_id == Form.id).with_entities(
+        Form.id, Form.form_name, func.count(Inspection.id), func.max(Inspection.created_at)
+    ).group_by(Form.id, Form.form_name).order_by(Form.id).all()
+
+    form_ids = [form_stat[0] for form_stat in form_stats]
+    form_names = {form_stat[0]: form_stat[1] for form_stat in form_stats}
+    fields_by_form: Dict[int, List[FormField]] = {form_id: [] for form_id in form_ids}
+    if form_ids:
+        for field in db.query(FormField).filter(
+            FormField.form_id.in_(form_ids)
+        ).order_by(FormField.form_id, FormField.field_order).all():
+            fields_by_form[field.form_id].append(field)
+
+    # === SUMMARY SHEET ===
+    form_name_display = "All Forms"
+    if filters.get("form_id"):
+        form_name_display = form_names.get(filters["form_id"]) or form_name_display
+
+    summary_rows: List[List[Any]] = [
+        [_styled_cell(summary_ws, "INSPECTION EXPORT SUMMARY", font=TITLE_FONT,
+                      alignment=Alignment(horizontal='center', vertical='center'))],
+        [],
+        [_styled_cell(summary_ws, "Export Details", font=SECTION_FONT, fill=SUBHEADER_FILL)],
+        [f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"],
+        [f"Total Inspections: {total_inspections}"],
+        [f"Date Range: {filters.get('start_date') or 'All'} to {filters.get('end_date') or 'All'}"],
+        [f"Form Filter: {form_name_display}"],
+        [f"Status Filter: {filters.get('status_filter') or 'All Statuses'}"],
+        [],
+        [_styled_cell(summary_ws, "Status Distribution", font=SECTION_FONT, fill=SUBHEADER_FILL)],
+        [_styled_cell(summary_ws, header, font=SUBHEADER_FONT, fill=SUBHEADER_FILL,
+                      alignment=SUBHEADER_ALIGNMENT, border=THIN_BORDER)
+         for header in ["Status", "Count", "Percentage"]],
+    ]
+
+    for status_enum, count in status_counts:
+        status_name = status_enum.value
+        percentage = f"{(count/total_inspections*100):.1f}%" if total_inspections > 0 else "0%"
+        if status_name == 'accepted':
+            fill = PASS_FILL
+        elif status_name == 'rejected':
+            fill = HOLD_FILL
+        else:
+            fill = PENDING_FILL
+        summary_rows.append([
+            _styled_cell(summary_ws, value, font=CELL_FONT, fill=fill, alignment=CELL_ALIGNMENT, border=THIN_BORDER)
+            for value in [status_name.upper(), count, percentage]
+        ])
+
+    summary_rows.append([])
+    summary_rows.append([_styled_cell(summary_ws, "📝 Form Distribution", font=SECTION_FONT, fill=SUBHEADER_FILL)])
+    summary_rows.append([
+        _styled_cell(summary_ws, header, font=SUBHEADER_FONT, fill=SUBHEADER_FILL,
+                     alignment=SUBHEADER_ALIGNMENT, border=THIN_BORDER)
+        for header in ["Form Name", "Count", "Percentage"]
+    ])
+    for form_id, form_name, count, _last_used in form_stats:
+        percentage = f"{(count/total_inspections*100):.1f}%" if total_inspections > 0 else "0%"
+        summary_rows.append([
+            _styled_cell(summary_ws, value, font=CELL_FONT, alignment=CELL_ALIGNMENT, border=THIN_BORDER)
+            for value in [form_name, count, percentage]
+        ])
+
+    # Write-only sheets fix column widths at the first append
+    summary_widths = ColumnWidthTracker()
+    for row in summary_rows:
+        summary_widths.observe_row(row)
+    summary_widths.apply(summary_ws)
+    for row in summary_rows:
+        summary_ws.append(row)
+
+    # === FORMS OVERVIEW SHEET ===
+    forms_rows: List[List[Any]] = [
+        [_styled_cell(forms_ws, "📝 FORMS OVERVIEW", font=TITLE_FONT,
+                      alignment=Alignment(horizontal='center', vertical='center'))],
+        [],
+        [_styled_cell(forms_ws, header, font=SUBHEADER_FONT, fill=SUBHEADER_FILL,
+                      alignment=SUBHEADER_ALIGNMENT, border=THIN_BORDER)
+         for header in ["Form Name", "Total Fields", "Field Types", "Inspections Count", "Last Used"]],
+    ]
+    for form_id, form_name, count, last_used in form_stats:
+        form_fields = fields_by_form.get(form_id, [])
+        field_types = sorted(set(field_type_value(field) for field in form_fields))
+        forms_rows.append([
+            _styled_cell(forms_ws, value, font=CELL_FONT, alignment=CELL_ALIGNMENT, border=THIN_BORDER)
+            for value in [
+                form_name,
+                len(form_fields),
+                ", ".join(field_types),
+                count,
+                last_used.strftime('%Y-%m-%d') if last_used else "Never"
+            ]
+        ])
+
+    forms_widths = ColumnWidthTracker()
+    for row in forms_rows:
+        forms_widths.observe_row(row)
+    forms_widths.apply(forms_ws)
+    for row in forms_rows:
+        forms_ws.append(row)
+
+    return total_inspections, form_stats, fields_by_form
+
+
+def _stream_detail_sheet(
+    ws,
+    headers: List[str],
+    row_chunks: Iterator[List[List[Any]]],
+    make_header_cell: Callable[[Any, Any], Any],
+    make_cell: Callable[[Any, Any], Any],
+    on_chunk: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Append a header and chunks of detail rows to a write-only sheet.
+
+    Widths must be set before the first append, so they are sized from the
+    header and the first chunk as it is written. on_chunk is called with the
+    number of rows in every chunk. Returns the number of rows written.
+    """
+    widths = ColumnWidthTracker()
+    widths.observe_row(headers)
+    header_written = False
+
+    written = 0
+    for rows in row_chunks:
+        if not header_written:
+            for row_data in rows:
+                widths.observe_row(row_data)
+            widths.apply(ws)
+            ws.append([make_header_cell(ws, header) for header in headers])
+            header_written = True
+
+        for row_data in rows:
+            ws.append([make_cell(ws, value) for value in row_data])
+
+        written += len(rows)
+        if on_chunk:
+            on_chunk(len(rows))
+
+    if not header_written:
+        widths.apply(ws)
+        ws.append([make_header_cell(ws, header) for header in headers])
+
+    return written
+
+
+def write_streaming_workbook(
+    db: Session,
+    query,
+    filters: Dict[str, Any],
+    path: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Write the export workbook to `path` using openpyxl's write-only mode.
+
+    Summary and forms overview statistics come from aggregate queries, and
+    the detail sheet is filled chunk by chunk, so only one chunk of
+    inspections and responses is held in memory at a time.
+
+    progress, if given, is called with (written, total) after every chunk.
+    Returns the number of inspections written.
+    """
+    wb = Workbook(write_only=True)
+    summary_ws = wb.create_sheet("📊 Summary")
+    detail_ws = wb.create_sheet("📋 Detailed Data")
+    forms_ws = wb.create_sheet("📝 Forms Overview")
+
+    total_inspections, form_stats, fields_by_form = _write_overview_sheets(
+        db, summary_ws, forms_ws, query, filters
+    )
+    form_names = {form_stat[0]: form_stat[1] for form_stat in form_stats}
+
+    # === DETAILED DATA SHEET ===
+    all_fields = [field for form_stat in form_stats for field in fields_by_form[form_stat[0]]]
+    written = 0
+
+    def on_chunk(rows_written: int) -> None:
+        nonlocal written
+        written += rows_written
+        logger.debug(f"Streamed {written}/{total_inspections} inspections to {path}")
+        if progress:
+            progress(written, total_inspections)
+
+    _stream_detail_sheet(
+        detail_ws,
+        detail_headers(all_fields),
+        iter_detail_rows(db, query, form_names, all_fields, chunk_size),
+        lambda ws, value: _styled_cell(ws, value, font=HEADER_FONT, fill=HEADER_FILL,
+                                       alignment=HEADER_ALIGNMENT, border=THIN_BORDER),
+        lambda ws, value: _styled_cell(ws, value, font=CELL_FONT, alignment=CELL_ALIGNMENT, border=THIN_BORDER),
+        on_chunk
+    )
+
+    wb.save(path)
+    return written
+
+
+def write_per_form_workbook(
+    db: Session,
+    query,
+    filters: Dict[str, Any],
+    path: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Write the export workbook with one detail sheet per form.
+
+    Each form's sheet only has that form's field columns instead of the
+    union of all exported forms, and detail cells use registered named
+    styles rather than per-cell font/fill/border objects. Sheets are
+    streamed one form at a time, like write_streaming_workbook.
+    """
+    wb = Workbook(write_only=True)
+    _register_named_styles(wb)
+    summary_ws = wb.create_sheet("📊 Summary")
+    forms_ws = wb.create_sheet("📝 Forms Overview")
+
+    total_inspections, form_stats, fields_by_form = _write_overview_sheets(
+        db, summary_ws, forms_ws, query, filters
+    )
+    form_names = {form_stat[0]: form_stat[1] for form_stat in form_stats}
+    used_titles = {summary_ws.title.lower(), forms_ws.title.lower()}
+    written = 0
+
+    def on_chunk(rows_written: int) -> None:
+        nonlocal written
+        written += rows_written
+        logger.debug(f"Streamed {written}/{total_inspections} inspections to {path}")
+        if progress:
+            progress(written, total_inspections)
+
+    for form_id, form_name, _count, _last_used in form_stats:
+        form_ws = wb.create_sheet(sheet_title(form_name, used_titles))
+        form_fields = fields_by_form[form_id]
+        _stream_detail_sheet(
+            form_ws,
+            detail_headers(form_fields),
+            iter_detail_rows(db, query.filter(Inspection.form_id == form_id), form_names, form_fields, chunk_size),
+            lambda ws, value: _named_cell(ws, value, HEADER_STYLE_NAME),
+            lambda ws, value: _named_cell(ws, value, CELL_STYLE_NAME),
+            on_chunk
+        )
+
+    wb.save(path)
+    return written
+
+
+def write_csv_export(
+    db: Session,
+    query,
+    filters: Dict[str, Any],
+    path: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Write the "Detailed Data" columns to a plain CSV file, chunk by chunk.
+
+    filters is unused; it keeps the signature shared with the other writers.
+    Returns the number of inspections written.
+    """
+    form_names, fields = load_export_fields(db, query)
+    total = query.order_by(None).count() if progress else 0
+
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columnar_headers(fields))
+        for rows in iter_detail_rows(db, query, form_names, fields, chunk_size):
+            writer.writerows(rows)
+            written += len(rows)
+            if progress:
+                progress(written, total)
+
+    return written
+
+
+def write_parquet_export(
+    db: Session,
+    query,
+    filters: Dict[str, Any],
+    path: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Write the "Detailed Data" columns to a Parquet file, one row group per chunk.
+
+    Inspection ID is stored as int64, every other column as a string in the
+    same text form the Excel sheet shows. Returns the number of inspections written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires the pyarrow package"
+        )
+
+    form_names, fields = load_export_fields(db, query)
+    headers = columnar_headers(fields)
+    schema = pa.schema(
+        [pa.field(headers[0], pa.int64())] + [pa.field(header, pa.string()) for header in headers[1:]]
+    )
+    total = query.order_by(None).count() if progress else 0
+
+    written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in iter_detail_rows(db, query, form_names, fields, chunk_size):
+            columns = list(zip(*rows))
+            arrays = [pa.array(columns[0], type=pa.int64())] + [
+                pa.array([str(value) for value in column], type=pa.string())
+                for column in columns[1:]
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += len(rows)
+            if progress:
+                progress(written, total)
+
+    return written
+
+
+# Excel layouts: one combined "Detailed Data" sheet, or one sheet per form
+EXCEL_LAYOUTS = {
+    "combined": write_streaming_workbook,
+    "per_form": write_per_form_workbook,
+}
+
+# Export formats served by the export endpoints and background jobs.
+# Every writer takes (db, query, filters, path, chunk_size, progress).
+EXPORT_FORMATS = {
+    "xlsx": {
+        "extension": ".xlsx",
+        "media_type": EXCEL_MEDIA_TYPE,
+        "writer": write_streaming_workbook,
+    },
+    "csv": {
+        "extension": ".csv",
+        "media_type": "text/csv",
+        "writer": write_csv_export,
+    },
+    "parquet": {
+        "extension": ".parquet",
+        "media_type": "application/vnd.apache.parquet",
+        "writer": write_parquet_export,
+    },
+}
+
+
+def parse_export_format(export_format: str) -> Dict[str, Any]:
+    """Validate an export format name and return its EXPORT_FORMATS entry"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    return EXPORT_FORMATS[export_format]
+
+
+def parse_export_layout(layout: str, export_format: str) -> str:
+    """Validate an Excel layout name for the given export format"""
+    if layout not in EXCEL_LAYOUTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid layout. Must be one of: {', '.join(EXCEL_LAYOUTS)}"
+        )
+    if layout != "combined" and export_format != "xlsx":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The per_form layout is only available for xlsx exports"
+        )
+    return layout
+
+
+def export_writer(export_format: str, layout: str = "combined") -> Callable[..., int]:
+    """Return the chunked writer for an export format and layout"""
+    if export_format == "xlsx":
+        return EXCEL_LAYOUTS[layout]
+    return EXPORT_FORMATS[export_format]["writer"]
+
+
+def render_export_file(
+    filters: Dict[str, Any],
+    scope_user_id: Optional[int],
+    export_format: str,
+    layout: str,
+    path: str
+) -> int:
+    """Write a chunked export to `path` (runs in a render pool worker process)"""
+    db = SessionLocal()
+    try:
+        query = build_export_query(db, filters, scope_user_id)
+        return export_writer(export_format, layout)(db, query, filters, path)
+    finally:
+        db.close()
+
+
+def render_workbook_bytes(filters: Dict[str, Any], scope_user_id: Optional[int]) -> bytes:
+    """Build the in-memory styled workbook and return it as bytes (runs in a render pool worker)"""
+    db = SessionLocal()
+    try:
+        wb = build_workbook(db, build_export_query(db, filters, scope_user_id), filters)
+        excel_buffer = BytesIO()
+        wb.save(excel_buffer)
+        return excel_buffer.getvalue()
+    finally:
+        db.close()
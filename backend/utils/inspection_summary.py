@@ -0,0 +1,38 @@
+"""
+Denormalized per-inspection response summary.
+
+Inspection rows carry response_count, flagged_count, pass_count and
+hold_count so list, dashboard and export paths can read them without
+loading every InspectionResponse. These helpers keep the counters in sync
+whenever an inspection's responses are written.
+"""
+
+from typing import Any, Dict, Iterable
+
+
+def summarize_responses(responses: Iterable[Any]) -> Dict[str, int]:
+    """Count total, flagged, pass and hold responses"""
+    summary = {"response_count": 0, "flagged_count": 0, "pass_count": 0, "hold_count": 0}
+
+    for response in responses:
+        summary["response_count"] += 1
+
+        if response.is_flagged:
+            summary["flagged_count"] += 1
+
+        pass_hold_status = response.pass_hold_status
+        if pass_hold_status is not None:
+            # Handle both enum and string types for pass_hold_status
+            status_value = pass_hold_status.value if hasattr(pass_hold_status, 'value') else str(pass_hold_status)
+            if status_value.lower() == "pass":
+                summary["pass_count"] += 1
+            elif status_value.lower() == "hold":
+                summary["hold_count"] += 1
+
+    return summary
+
+
+def apply_response_summary(inspection: Any, responses: Iterable[Any]) -> None:
+    """Store the response summary counters on an Inspection row"""
+    for column, value in summarize_responses(responses).items():
+        setattr(inspection, column, value)
@@ -0,0 +1,667 @@
+"""
+PDF inspection report rendering.
+
+build_inspection_pdf renders the report for one inspection. It is used by
+the single-inspection export endpoint and, through render_inspection_pdf_file,
+by bulk exports that render many reports in the render process pool.
+
+Rendered reports are kept in pdf_cache, keyed by inspection id, the
+inspection's and form's revision and PDF_TEMPLATE_VERSION, so unchanged
+(e.g. accepted) inspections are rendered once. The same key doubles as
+the report's ETag. Reviewed inspections are pre-rendered into the cache
+by prerender_inspection_pdf right after the review commits.
+"""
+
+import asyncio
+import base64
+import hashlib
+import importlib.util
+import os
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from PIL import Image as PILImage
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Form, Inspection, User
+from .file_cache import FileCache
+from .flag_evaluator import is_response_flagged
+from .image_cache import image_cache, image_cache_key
+from .inspection_export import field_type_value
+from .logging_config import get_logger
+from .pdf_template import (
+    PAGE_MARGIN,
+    TITLE_STYLE,
+    SUBTITLE_STYLE,
+    SECTION_STYLE,
+    TABLE_HEADER_STYLE,
+    QUESTION_STYLE,
+    ANSWER_STYLE,
+    SIGNATURE_CAPTION_STYLE,
+    FLAG_COLOR,
+    CLEAR_COLOR,
+    INFO_COL_WIDTHS,
+    RESPONSE_COL_WIDTHS,
+    INFO_TABLE_COMMANDS,
+    INFO_ROW_BACKGROUNDS,
+    RESPONSE_TABLE_COMMANDS,
+    PASS_ROW_BACKGROUND,
+    HOLD_ROW_BACKGROUND,
+    ODD_ROW_BACKGROUND,
+    EVEN_ROW_BACKGROUND,
+    FLAGGED_ROW_BACKGROUND,
+    FLAGGED_ROW_TEXT,
+)
+from .render_pool import run_in_render_pool
+
+logger = get_logger(__name__)
+
+PDF_MEDIA_TYPE = "application/pdf"
+
+# Upper bound on inspections in one bulk PDF export
+PDF_BULK_MAX_INSPECTIONS = int(os.getenv("PDF_BULK_MAX_INSPECTIONS", "1000"))
+
+# Largest image (in decoded pixels) embedded in a report; bounds memory per image
+PDF_IMAGE_MAX_PIXELS = int(os.getenv("PDF_IMAGE_MAX_PIXELS", "25000000"))
+
+# Integer-factor reduction applied before resampling when an image is at least
+# this many times larger than its target
+PDF_IMAGE_REDUCING_GAP = 3.0
+
+# Bump whenever build_inspection_pdf output changes, so cached reports are re-rendered
+PDF_TEMPLATE_VERSION = 2
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join("cache", "pdfs"))
+PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "512"))
+
+pdf_cache = FileCache(PDF_CACHE_DIR, max_bytes=PDF_CACHE_MAX_MB * 1024 * 1024)
+
+
+def pdf_cache_key(inspection: Inspection, form: Form) -> str:
+    """
+    Cache key (and ETag source) for an inspection's rendered report.
+
+    Revisions move on every UPDATE of the row, including same-second ones and
+    field edits (which touch the form), where updated_at alone would not.
+    """
+    updated = inspection.updated_at or inspection.created_at
+    return ":".join([
+        str(inspection.id),
+        f"r{inspection.revision}",
+        updated.isoformat() if updated else "",
+        f"f{form.id}r{form.revision}",
+        f"v{PDF_TEMPLATE_VERSION}",
+    ])
+
+
+def pdf_etag(cache_key: str) -> str:
+    """Strong ETag for the report identified by cache_key"""
+    return '"' + hashlib.sha256(cache_key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value covers etag"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def process_image_for_pdf(base64_data: str, max_width: float, max_height: float, field_id: int, image_type: str = "image"):
+    """
+    Robust image processing function for PDF export
+    Returns ReportLab Image object or None if processing fails
+    
+    Processed images are cached by content hash and target size, so repeat
+    renders of the same photo or signature skip decoding and resizing.
+    Images are decoded once, JPEGs at reduced scale, and anything above
+    PDF_IMAGE_MAX_PIXELS after that is rejected.
+    """
+    try:
+        logger.info(f"Processing {image_type} for field {field_id}: Starting processing")
+        
+        # Validate input
+        if not base64_data or not isinstance(base64_data, str):
+            logger.error(f"Processing {image_type} for field {field_id}: Invalid base64 data")
+            return None
+        
+        cache_key = image_cache_key(base64_data, max_width, max_height, image_type)
+        cached = image_cache.get(cache_key)
+        if cached:
+            cached_data, cached_width, cached_height = cached
+            logger.info(f"Processing {image_type} for field {field_id}: Using cached image")
+            return Image(BytesIO(cached_data), width=cached_width, height=cached_height)
+        
+        # Clean base64 data
+        clean_data = base64_data.strip()
+        
+        # Remove data URL prefix if present
+        if clean_data.startswith('data:image'):
+            if ',' not in clean_data:
+                logger.error(f"Processing {image_type} for field {field_id}: Invalid data URL format")
+                return None
+            clean_data = clean_data.split(',')[1]
+        
+        # Add padding if necessary
+        missing_padding = len(clean_data) % 4
+        if missing_padding:
+            clean_data += '=' * (4 - missing_padding)
+        
+        # Decode base64
+        try:
+            image_data = base64.b64decode(clean_data)
+        except Exception as e:
+            logger.error(f"Processing {image_type} for field {field_id}: Base64 decode error: {e}")
+            return None
+        
+        # Validate decoded data
+        if len(image_data) < 100:  # Minimum reasonable image size
+            logger.error(f"Processing {image_type} for field {field_id}: Image data too small")
+            return None
+        
+        # Open lazily: only the header is parsed until the image is loaded
+        try:
+            pil_image = PILImage.open(BytesIO(image_data))
+        except Exception as e:
+            logger.error(f"Processing {image_type} for field {field_id}: PIL Image error: {e}")
+            return None
+        
+        # Calculate optimal size while maintaining aspect ratio
+        original_width, original_height = pil_image.size
+        aspect_ratio = original_width / original_height
+        
+        # Calculate new dimensions
+        if aspect_ratio > max_width / max_height:
+            # Width is the limiting factor
+            new_width = max_width
+            new_height = max_width / aspect_ratio
+        else:
+            # Height is the limiting factor
+            new_height = max_height
+            new_width = max_height * aspect_ratio
+        
+        # Ensure minimum size
+        min_size = 20  # Minimum 20 points
+        new_width = max(new_width, min_size)
+        new_height = max(new_height, min_size)
+        
+        logger.info(f"Processing {image_type} for field {field_id}: Calculated size: {new_width}x{new_height}")
+        
+        # Resize image for better quality
+        resize_factor = 2  # Higher resolution for better quality
+        pixel_width = int(new_width * resize_factor)
+        pixel_height = int(new_height * resize_factor)
+        
+        # JPEG: let the decoder scale down by 1/2, 1/4 or 1/8 while decoding,
+        # so a 12 MP photo is never held in memory at full size
+        if pil_image.format == "JPEG":
+            pil_image.draft("RGB", (pixel_width, pixel_height))
+        
+        decoded_width, decoded_height = pil_image.size
+        if decoded_width * decoded_height > PDF_IMAGE_MAX_PIXELS:
+            logger.error(
+                f"Processing {image_type} for field {field_id}: Image too large "
+                f"({decoded_width}x{decoded_height} pixels)"
+            )
+            return None
+        
+        # Decode once; a truncated or corrupt image fails here
+        try:
+            pil_image.load()
+        except Exception as e:
+            logger.error(f"Processing {image_type} for field {field_id}: PIL Image error: {e}")
+            return None
+        
+        # Convert to RGB if necessary
+        if pil_image.mode not in ['RGB', 'L']:
+            pil_image = pil_image.convert('RGB')
+        
+        # reducing_gap shrinks by an integer factor (Image.reduce) before the LANCZOS pass
+        resized_image = pil_image.resize(
+            (pixel_width, pixel_height), PILImage.Resampling.LANCZOS, reducing_gap=PDF_IMAGE_REDUCING_GAP
+        )
+        
+        # Save to buffer with high quality
+        final_buffer = BytesIO()
+        if image_type == "signature":
+            # Use PNG for signatures to preserve transparency
+            resized_image.save(final_buffer, format='PNG', optimize=True)
+        else:
+            # Use JPEG for photos with high quality
+            resized_image.save(final_buffer, format='JPEG', quality=90, optimize=True)
+        
+        image_cache.put(cache_key, final_buffer.getvalue(), new_width, new_height)
+        
+        # Create ReportLab Image using buffer directly
+        final_buffer.seek(0)
+        reportlab_image = Image(final_buffer, width=new_width, height=new_height)
+        
+        logger.info(f"Processing {image_type} for field {field_id}: Successfully created ReportLab Image")
+        return reportlab_image
+        
+    except Exception as e:
+        logger.error(f"Processing {image_type} for field {field_id}: Unexpected error: {e}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return None
+
+
+def build_inspection_pdf(db: Session, inspection: Inspection, form: Form) -> bytes:
+    """Render the PDF report for one inspection (questions left, answers right)"""
+    # Get inspector info
+    inspector = db.query(User).filter(User.id == inspection.inspector_id).first()
+    
+    # Create PDF in memory buffer
+    pdf_buffer = BytesIO()
+    
+    # Create the PDF document using memory buffer
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, 
+                           rightMargin=PAGE_MARGIN, leftMargin=PAGE_MARGIN,
+                           topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN)
+    
+    # Container for the 'Flowable' objects
+    elements = []
+    
+    # Title and subtitle with form name
+    elements.append(Paragraph("<b>INSPECTION REPORT</b>", TITLE_STYLE))
+    elements.append(Paragraph(f"<i>{form.form_name}</i>", SUBTITLE_STYLE))
+    elements.append(Spacer(1, 16))
+    
+    # Enhanced Inspection Info Section
+    elements.append(Paragraph("<b>INSPECTION DETAILS</b>", SECTION_STYLE))
+    elements.append(Spacer(1, 8))
+    
+    status_indicator = f"{inspection.status.value.upper()}"
+    
+    # Flag summary for inspection details comes from the counters stored on write
+    flag_summary = {
+        "flagged_count": inspection.flagged_count,
+        "total_responses": inspection.response_count,
+        "pass_count": inspection.pass_count,
+        "hold_count": inspection.hold_count
+    }
+    
+    # Determine overall flag status
+    overall_flag = "FLAGGED" if flag_summary["flagged_count"] > 0 else "CLEAR"
+    flag_color = FLAG_COLOR if flag_summary["flagged_count"] > 0 else CLEAR_COLOR
+    
+    info_data = [
+        ['Inspection ID:', str(inspection.id)],
+        ['Form:', form.form_name],
+        ['Inspector:', inspector.username if inspector else 'N/A'],
+        ['Flag Status:', overall_flag],
+        ['Status:', status_indicator],
+        ['Created:', inspection.created_at.strftime('%Y-%m-%d %H:%M:%S')],
+        ['Updated:', inspection.updated_at.strftime('%Y-%m-%d %H:%M:%S')]
+    ]
+    
+    if inspection.reviewed_by:
+        reviewer = db.query(User).filter(User.id == inspection.reviewed_by).first()
+        info_data.append(['Reviewed By:', reviewer.username if reviewer else 'N/A'])
+        if inspection.reviewed_at:
+            info_data.append(['Reviewed At:', inspection.reviewed_at.strftime('%Y-%m-%d %H:%M:%S')])
+    
+    if inspection.rejection_reason:
+        info_data.append(['Rejection Reason:', inspection.rejection_reason])
+    
+    info_table = Table(info_data, colWidths=INFO_COL_WIDTHS)
+    info_table.setStyle(TableStyle(
+        INFO_TABLE_COMMANDS
+        + [('BACKGROUND', (1, 3), (1, 3), flag_color)]
+        + [('BACKGROUND', (1, i), (1, i), INFO_ROW_BACKGROUNDS[i % 2])
+           for i in range(len(info_data)) if i != 3]  # Skip flag status row
+    ))
+    
+    elements.append(info_table)
+    elements.append(Spacer(1, 24))
+    
+    # Enhanced Responses Section
+    elements.append(Paragraph("<b>INSPECTION RESPONSES</b>", SECTION_STYLE))
+    elements.append(Spacer(1, 12))
+    
+    # Get all responses mapped by field_id
+    responses_map = {resp.field_id: resp for resp in inspection.responses}
+    
+    # Sort fields by field_order
+    sorted_fields = sorted(form.fields, key=lambda f: f.field_order)
+    
+    # Create responses table with enhanced formatting
+    response_data = [
+        [
+            Paragraph("<b>QUESTION</b>", TABLE_HEADER_STYLE),
+            Paragraph("<b>RESPONSE</b>", TABLE_HEADER_STYLE)
+        ]
+    ]
+    
+    # Answer cell background per data row (PASS / HOLD / alternating)
+    row_backgrounds = {}
+    
+    # Track flagged rows for styling
+    flagged_rows = []
+    
+    for field in sorted_fields:
+        field_response = responses_map.get(field.id)
+        logger.debug(f"Processing field {field.id}: {field.field_name} ({field.field_type})")
+        
+        # Simplified question formatting
+        question_text = field.field_name
+        if field.is_required:
+            question_text += " <font color='red'>*</font>"
+        
+        # Enhanced answer formatting with status indicators
+        field_type = field_type_value(field)
+        answer_text = ""
+        is_flagged = False
+        
+        if field_response:
+            # Evaluate flag conditions for this response
+            is_flagged = is_response_flagged(
+                field,
+                field_response.response_value,
+                field_response.measurement_value
+            )
+            
+            if field_response.response_value:
+                # Handle different field types with appropriate formatting
+                if field_type == 'signature' and field_response.response_value.startswith('data:image'):
+                    # Process signature image using robust function with very small dimensions
+                    signature_image = process_image_for_pdf(
+                        field_response.response_value, 
+                        max_width=1*inch, 
+                        max_height=0.5*inch, 
+                        field_id=field.id, 
+                        image_type="signature"
+                    )
+                    
+                    if signature_image:
+                        # Create a very compact signature display
+                        signature_content = [
+                            Paragraph("<font color='#059669' size='6'>[Digital Signature]</font>", SIGNATURE_CAPTION_STYLE),
+                            signature_image
+                        ]
+                        
+                        # Add this row with special handling for image
+                        question_paragraph = Paragraph(f"<b>{question_text}</b>", QUESTION_STYLE)
+                        
+                        response_data.append([question_paragraph, signature_content])
+                        
+                        # Track flagged rows if needed
+                        if is_flagged:
+                            flagged_rows.append(len(response_data) - 1)
+                        
+                        continue  # Skip the normal processing for this field
+                    else:
+                        answer_text = "<font color='#dc2626'>[Error processing signature]</font>"
+                elif field_type == 'photo':
+                    if field_response.response_value:
+                        # Use proper ReportLab units to prevent layout errors
+                        photo_image = process_image_for_pdf(
+                            field_response.response_value, 
+                            max_width=1.5*inch, 
+                            max_height=1*inch, 
+                            field_id=field.id, 
+                            image_type="photo"
+                        )
+                        if photo_image:
+                            # Create a combined answer with text and image (similar to signature handling)
+                            answer_paragraph = [
+                                Paragraph("📷 <font color='#059669'>[Photo Evidence]</font>", ANSWER_STYLE),
+                                photo_image
+                            ]
+                            
+                            # Add this row with special handling for image
+                            question_paragraph = Paragraph(f"<b>{question_text}</b>", QUESTION_STYLE)
+                            
+                            response_data.append([question_paragraph, answer_paragraph])
+                            
+                            # Track flagged rows if needed
+                            if is_flagged:
+                                flagged_rows.append(len(response_data) - 1)
+                            
+                            continue  # Skip the normal processing for this field
+                        else:
+                            answer_text = "<font color='#dc2626'>[Error processing photo]</font>"
+                    else:
+                        answer_text = "📷 <font color='#dc2626'>[No photo provided]</font>"
+                elif field_type == 'datetime':
+                    answer_text = f"{field_response.response_value}"
+                elif field_type == 'time':
+                    answer_text = f"{field_response.response_value}"
+                elif field_type == 'dropdown' or field_type == 'search_dropdown':
+                    answer_text = f"{field_response.response_value}"
+                else:
+                    answer_text = str(field_response.response_value)
+            
+            # Handle measurement values with units
+            if field_response.measurement_value is not None:
+                unit = ""
+                if field.field_options and 'unit' in field.field_options:
+                    unit = f" {field.field_options['unit']}"
+                answer_text = f"{field_response.measurement_value}{unit}"
+            
+            # Handle status indicators differently for KeepTogether vs text
+            status_indicators = []
+            
+            # Enhanced pass/hold status with color coding
+            if field_response.pass_hold_status:
+                # Handle both enum and string types for pass_hold_status
+                if hasattr(field_response.pass_hold_status, 'value'):
+                    status_value = field_response.pass_hold_status.value.upper()
+                else:
+                    status_value = str(field_response.pass_hold_status).upper()
+                if status_value == 'PASS':
+                    status_indicator = f"<font color='#059669'><b>[{status_value}]</b></font>"
+                else:  # HOLD
+                    status_indicator = f"<font color='#dc2626'><b>[{status_value}]</b></font>"
+                status_indicators.append(status_indicator)
+            
+            # Add flag indicator if flagged
+            if is_flagged:
+                status_indicators.append("<font color='#dc2626'><b>[FLAGGED]</b></font>")
+            
+            # Apply status indicators based on answer_text type
+            if isinstance(answer_text, Image):
+                # For Image objects (photos), create a simple list with image and status
+                if status_indicators:
+                    status_text = " ".join(status_indicators)
+                    status_paragraph = Paragraph(status_text, ANSWER_STYLE)
+                    answer_text = [answer_text, status_paragraph]
+                # If no status indicators, keep just the image
+            else:
+                # For text answers, append status indicators directly
+                if status_indicators:
+                    status_text = " " + " ".join(status_indicators)
+                    answer_text += status_text if answer_text else status_text[1:]  # Remove leading space if no answer
+        else:
+            answer_text = "<font color='#9ca3af'>— No response provided —</font>"
+        
+        # Create formatted paragraphs
+        question_paragraph = Paragraph(f"<b>{question_text}</b>", QUESTION_STYLE)
+        
+        # Handle different answer types (text vs list/Image for images)
+        if isinstance(answer_text, (list, Image)):
+            # For images (photos/signatures), answer_text is already a flowable
+            answer_paragraph = answer_text
+        else:
+            # For text answers, create a Paragraph; PASS / HOLD rows get a tinted answer cell
+            answer_paragraph = Paragraph(answer_text, ANSWER_STYLE)
+            if 'PASS' in answer_text:
+                row_backgrounds[len(response_data)] = PASS_ROW_BACKGROUND
+            elif 'HOLD' in answer_text:
+                row_backgrounds[len(response_data)] = HOLD_ROW_BACKGROUND
+        
+        response_data.append([question_paragraph, answer_paragraph])
+        
+        # Track flagged rows (add 1 because header is row 0)
+        if is_flagged:
+            flagged_rows.append(len(response_data) - 1)
+    
+    # Create the enhanced table with better row height control
+    response_table = Table(response_data, colWidths=RESPONSE_COL_WIDTHS, repeatRows=1)
+    
+    response_table.setStyle(TableStyle(
+        RESPONSE_TABLE_COMMANDS
+        # Answer cell backgrounds for non-flagged rows
+        + [('BACKGROUND', (1, i), (1, i), row_backgrounds.get(i, ODD_ROW_BACKGROUND if i % 2 == 1 else EVEN_ROW_BACKGROUND))
+           for i in range(1, len(response_data)) if i not in flagged_rows]
+        # Red background, dark red bold text for flagged abnormal data
+        + [command
+           for i in flagged_rows
+           for command in (
+               ('BACKGROUND', (0, i), (-1, i), FLAGGED_ROW_BACKGROUND),
+               ('TEXTCOLOR', (0, i), (-1, i), FLAGGED_ROW_TEXT),
+               ('FONTNAME', (0, i), (-1, i), 'Helvetica-Bold'),
+           )]
+    ))
+    
+    elements.append(response_table)
+    
+    # Build PDF
+    doc.build(elements)
+    
+    # Get PDF content from buffer
+    pdf_buffer.seek(0)
+    pdf_content = pdf_buffer.getvalue()
+    pdf_buffer.close()
+    
+    return pdf_content
+    
+
+
+def render_inspection_pdf(inspection_id: int) -> Optional[bytes]:
+    """
+    Render one inspection's report (runs in a render pool worker).
+
+    Returns None if the inspection or its form no longer exists.
+    """
+    db = SessionLocal()
+    try:
+        inspection = db.query(Inspection).filter(Inspection.id == inspection_id).first()
+        form = db.query(Form).filter(Form.id == inspection.form_id).first() if inspection else None
+        if not form:
+            return None
+        return build_inspection_pdf(db, inspection, form)
+    finally:
+        db.close()
+
+
+def cache_inspection_pdf(inspection_id: int, path: Optional[str] = None) -> bool:
+    """
+    Make sure an inspection's current report is in pdf_cache (runs in a render pool worker).
+
+    With path, the report is also written there, even when it is too large
+    to be cached. Returns False if the inspection or its form no longer
+    exists.
+    """
+    db = SessionLocal()
+    try:
+        inspection = db.query(Inspection).filter(Inspection.id == inspection_id).first()
+        form = db.query(Form).filter(Form.id == inspection.form_id).first() if inspection else None
+        if not form:
+            return False
+        cache_key = pdf_cache_key(inspection, form)
+        cached_path = pdf_cache.get(cache_key, ".pdf")
+        if not cached_path:
+            pdf_content = build_inspection_pdf(db, inspection, form)
+            cached_path = pdf_cache.put_bytes(cache_key, pdf_content, ".pdf")
+            if cached_path is None and path:
+                with open(path, "wb") as f:
+                    f.write(pdf_content)
+                return True
+        if path and cached_path:
+            shutil.copyfile(cached_path, path)
+        return True
+    finally:
+        db.close()
+
+
+def render_inspection_pdf_file(inspection_id: int, path: str) -> bool:
+    """Write one inspection's report to `path`, reusing the cached copy; False if it no longer exists"""
+    return cache_inspection_pdf(inspection_id, path)
+
+
+async def prerender_inspection_pdf(inspection_id: int) -> None:
+    """Background task: render an inspection's report into pdf_cache ahead of its first download"""
+    try:
+        await run_in_render_pool(cache_inspection_pdf, inspection_id)
+        logger.info(f"Pre-rendered PDF for inspection {inspection_id}")
+    except Exception as e:
+        logger.warning(f"Could not pre-render PDF for inspection {inspection_id}: {e}")
+
+
+def pack_pdf_reports(pdf_paths: List[str], path: str, merge: bool = False) -> None:
+    """
+    Pack rendered reports into `path` (runs in a render pool worker).
+
+    Writes a zip with one PDF per inspection or, with merge=True, a single
+    concatenated PDF.
+    """
+    if merge:
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for pdf_path in pdf_paths:
+            writer.append(pdf_path)
+        with open(path, "wb") as f:
+            writer.write(f)
+    else:
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for pdf_path in pdf_paths:
+                archive.write(pdf_path, os.path.basename(pdf_path))
+
+
+async def write_bulk_pdf_export(query, path: str, merge: bool = False) -> int:
+    """
+    Render the PDF report of every inspection the query matches into `path`.
+
+    Reports are rendered in parallel in the render process pool, then packed
+    into a zip (one PDF per inspection) or, with merge=True, concatenated
+    into a single PDF; packing runs in the pool too, off the event loop.
+    Returns the number of reports written.
+    """
+    if merge and importlib.util.find_spec("pypdf") is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Merged PDF export requires the pypdf package"
+        )
+
+    # One id past the cap is enough to know the export is too large
+    inspection_ids = [
+        row[0] for row in query.order_by(None).with_entities(Inspection.id)
+        .order_by(Inspection.id).limit(PDF_BULK_MAX_INSPECTIONS + 1)
+    ]
+    if not inspection_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No inspections found with the specified filters"
+        )
+    if len(inspection_ids) > PDF_BULK_MAX_INSPECTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many inspections for one PDF export; "
+                   f"narrow the filters to at most {PDF_BULK_MAX_INSPECTIONS}"
+        )
+
+    work_dir = tempfile.mkdtemp(prefix="inspection_pdfs_")
+    try:
+        pdf_paths = [os.path.join(work_dir, f"inspection_{inspection_id}.pdf") for inspection_id in inspection_ids]
+        rendered: List[bool] = await asyncio.gather(*[
+            run_in_render_pool(render_inspection_pdf_file, inspection_id, pdf_path)
+            for inspection_id, pdf_path in zip(inspection_ids, pdf_paths)
+        ])
+        pdf_paths = [pdf_path for pdf_path, ok in zip(pdf_paths, rendered) if ok]
+
+        await run_in_render_pool(pack_pdf_reports, pdf_paths, path, merge)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    logger.info(f"Wrote {len(pdf_paths)} inspection PDFs to {path}")
+    return len(pdf_paths)
@@ -0,0 +1,158 @@
+"""
+Styles for the PDF inspection report.
+
+Everything here is built once per process at import time and shared by
+every report build_inspection_pdf renders: paragraph styles, table column
+widths and the fixed part of each table style. Per-report code only adds
+the commands that depend on the rows (flag highlighting, row colours).
+"""
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+
+_sample_styles = getSampleStyleSheet()
+
+# Page margins (points)
+PAGE_MARGIN = 30
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_sample_styles['Heading1'],
+    fontSize=20,
+    textColor=colors.HexColor('#1e3a8a'),
+    spaceAfter=16,
+    spaceBefore=8,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+SECTION_STYLE = ParagraphStyle(
+    'SectionHeading',
+    parent=_sample_styles['Heading3'],
+    fontSize=14,
+    textColor=colors.HexColor('#374151'),
+    spaceAfter=8,
+    spaceBefore=12,
+    fontName='Helvetica-Bold',
+    backColor=colors.HexColor('#f3f4f6'),
+    borderWidth=1,
+    borderColor=colors.HexColor('#d1d5db'),
+    borderPadding=6,
+    leftIndent=6
+)
+
+NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_sample_styles['Normal'],
+    fontSize=10,
+    textColor=colors.HexColor('#374151'),
+    spaceAfter=4,
+    leading=12
+)
+
+SUBTITLE_STYLE = ParagraphStyle(
+    'Subtitle',
+    parent=NORMAL_STYLE,
+    fontSize=12,
+    textColor=colors.HexColor('#6b7280'),
+    alignment=TA_CENTER,
+    spaceAfter=20
+)
+
+TABLE_HEADER_STYLE = ParagraphStyle(
+    'TableHeader',
+    parent=NORMAL_STYLE,
+    fontSize=11,
+    textColor=colors.white,
+    fontName='Helvetica-Bold'
+)
+
+QUESTION_STYLE = ParagraphStyle('Question', parent=NORMAL_STYLE, fontSize=10, spaceAfter=2)
+ANSWER_STYLE = ParagraphStyle('Answer', parent=NORMAL_STYLE, fontSize=10, spaceAfter=2)
+SIGNATURE_CAPTION_STYLE = ParagraphStyle('SignatureCaption', parent=NORMAL_STYLE, fontSize=6, spaceAfter=0, spaceBefore=0)
+
+FLAG_COLOR = colors.HexColor('#dc2626')
+CLEAR_COLOR = colors.HexColor('#059669')
+
+INFO_COL_WIDTHS = [2.2*inch, 3.8*inch]
+RESPONSE_COL_WIDTHS = [3.2*inch, 3.3*inch]
+
+# Inspection details table; row 3 is the flag status, row 4 the inspection status
+INFO_TABLE_COMMANDS = [
+    # Header column styling
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#1e40af')),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (0, -1), 10),
+
+    # Data column styling
+    ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#f8fafc')),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#374151')),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (1, 0), (1, -1), 10),
+
+    # Flag status row special styling (background set per report)
+    ('TEXTCOLOR', (1, 3), (1, 3), colors.white),
+    ('FONTNAME', (1, 3), (1, 3), 'Helvetica-Bold'),
+
+    # Status row special styling
+    ('BACKGROUND', (1, 4), (1, 4), colors.HexColor('#f8fafc')),
+    ('TEXTCOLOR', (1, 4), (1, 4), colors.black),
+    ('FONTNAME', (1, 4), (1, 4), 'Helvetica-Bold'),
+
+    # General styling
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+]
+
+# Alternating backgrounds of the inspection details value column
+INFO_ROW_BACKGROUNDS = [colors.HexColor('#ffffff'), colors.HexColor('#f8fafc')]
+
+RESPONSE_TABLE_COMMANDS = [
+    # Header row styling
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+    # Question column styling
+    ('BACKGROUND', (0, 1), (0, -1), colors.HexColor('#f8fafc')),
+    ('TEXTCOLOR', (0, 1), (0, -1), colors.HexColor('#374151')),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('FONTNAME', (0, 1), (0, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (0, -1), 10),
+
+    # Answer column styling
+    ('TEXTCOLOR', (1, 1), (1, -1), colors.HexColor('#374151')),
+    ('ALIGN', (1, 1), (1, -1), 'LEFT'),
+    ('FONTNAME', (1, 1), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (1, 1), (1, -1), 10),
+
+    # Grid and spacing
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 12),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+    ('TOPPADDING', (0, 1), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+]
+
+# Answer cell backgrounds for rows with a PASS / HOLD status, and plain odd / even rows
+PASS_ROW_BACKGROUND = colors.HexColor('#f0fdf4')
+HOLD_ROW_BACKGROUND = colors.HexColor('#fef2f2')
+ODD_ROW_BACKGROUND = colors.HexColor('#ffffff')
+EVEN_ROW_BACKGROUND = colors.HexColor('#f9fafb')
+
+# Flagged (abnormal) rows
+FLAGGED_ROW_BACKGROUND = colors.HexColor('#fee2e2')
+FLAGGED_ROW_TEXT = colors.HexColor('#991b1b')
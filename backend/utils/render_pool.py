@@ -0,0 +1,71 @@
+"""
+Process pool for CPU-heavy rendering work (export workbooks, PDFs).
+
+Rendering is mostly pure Python (openpyxl, ReportLab), so threads would
+serialize on the GIL. Work submitted here runs in separate worker
+processes instead. Workers open their own database sessions; the pool
+initializer drops the connections inherited from the parent so a forked
+worker never shares a socket with the API process.
+
+Async endpoints go through run_in_render_pool, which awaits the result
+instead of blocking the event loop and caps how many render tasks this
+process has in flight, so interactive requests stay responsive while
+exports run.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Number of worker processes used for rendering
+RENDER_POOL_WORKERS = int(os.getenv("RENDER_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Render tasks allowed in flight at once; further callers wait their turn
+RENDER_MAX_CONCURRENCY = int(os.getenv("RENDER_MAX_CONCURRENCY", str(RENDER_POOL_WORKERS)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# One semaphore per event loop (asyncio primitives are bound to their loop)
+_render_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _init_worker() -> None:
+    """Worker initializer: discard pooled connections copied from the parent"""
+    from database import engine
+    engine.dispose(close=False)
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Return the shared render pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            logger.info(f"Starting render pool with {RENDER_POOL_WORKERS} worker processes")
+            _pool = ProcessPoolExecutor(max_workers=RENDER_POOL_WORKERS, initializer=_init_worker)
+        return _pool
+
+
+async def run_in_render_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run fn(*args) in the render pool and await its result without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    slots = _render_slots.get(loop)
+    if slots is None:
+        slots = _render_slots[loop] = asyncio.Semaphore(RENDER_MAX_CONCURRENCY)
+    async with slots:
+        return await asyncio.wrap_future(get_render_pool().submit(fn, *args))
+
+
+def shutdown_render_pool() -> None:
+    """Stop the render pool (called on application shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None